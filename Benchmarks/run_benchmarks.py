@@ -0,0 +1,267 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+if __name__ == "__main__":
+    # Run as a script: synthetic_data reuses the census shard generator of US Census Data/benchmark_consolidate.py
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "US Census Data"))
+from synthetic_data import write_biodiversity, write_census, write_climate, write_sales  # noqa: E402
+
+# Benchmark suite for the portfolio workflows. For every scale the synthetic datasets are generated once (and kept
+# in --data-dir between runs, keyed by scale and seed), then every step runs in its own process on them so its
+# wall time, CPU time and peak RSS are measured in isolation. Results are written as one JSON file per run, with
+# the commit and library versions, so runs of different versions can be compared with --compare.
+#
+#   python run_benchmarks.py                          every step at 1x
+#   python run_benchmarks.py --scale 1 100            every step at 1x and 100x
+#   python run_benchmarks.py --step sales_run --scale 10000 --data-dir /data/bench
+#   python run_benchmarks.py --compare results/benchmark_20260101T120000.json
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+RESULTS_DIR = os.path.join(HERE, "results")
+DATASET_META = "dataset.json"
+
+
+def generate_sales(directory, scale, seed):
+    return write_sales(os.path.join(directory, "sales_data.csv"), scale, seed)
+
+
+# Dataset name -> (generator, directory of the generated files inside the dataset directory)
+DATASETS = {
+    "sales": (generate_sales, "Data"),
+    "census": (write_census, "Raw Data CSVs"),
+    "climate": (write_climate, "."),
+    "biodiversity": (write_biodiversity, "Data"),
+}
+
+# Every step runs in the directory of its dataset (a copy of the project's layout), with the project's modules
+# importable. 'after' steps read the outputs of an earlier step on the same dataset.
+STEPS = [
+    {
+        "name": "sales_run",
+        "dataset": "sales",
+        "project": "Sales Report",
+        "command": ["-c", "import os; from Sales_Report import SalesReport; os.makedirs('Reports', exist_ok=True); "
+                          "SalesReport('Data/sales_data.csv', 'Data/trimmed_data.csv', report_dir='Reports').run()"],
+    },
+    {
+        "name": "census_consolidate",
+        "dataset": "census",
+        "project": "US Census Data",
+        "command": ["-c", "from census import consolidate, shard_files; "
+                          "consolidate(shard_files('Raw Data CSVs/states*.csv'))"],
+    },
+    {
+        "name": "climate_split",
+        "dataset": "climate",
+        "project": "Indonesian Climate Data",
+        "command": ["InClim_Clean_Split.py", "--rules", "{project}/outlier_rules.json"],
+    },
+    {
+        "name": "climate_impute",
+        "dataset": "climate",
+        "project": "Indonesian Climate Data",
+        "command": ["InClim_Fill_NaN.py", "--force", "--strategy", "{strategy}", "--workers", "{workers}"],
+        "after": "climate_split",
+    },
+    {
+        "name": "natpark_aggregate",
+        "dataset": "biodiversity",
+        "project": "NatPark Biodiversity",
+        "command": ["-c", "from biodiversity_store import BiodiversityStore; "
+                          "from Portfolio_Workflow import REPORT_SPECS, species_report; "
+                          "from species_index import first_common_name; "
+                          "store = BiodiversityStore.from_csv('Data/observations.csv', 'Data/species_info.csv'); "
+                          "species = store.species.assign(common_names=first_common_name(store.species.common_names)); "
+                          "sums, counts = store.species_park_matrix(); "
+                          "[species_report(store, species, sums, counts, spec) for spec in REPORT_SPECS]"],
+    },
+]
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def directory_bytes(directory):
+    return sum(os.path.getsize(os.path.join(path, name)) for path, _, names in os.walk(directory) for name in names)
+
+
+def prepare_dataset(name, scale, seed, data_dir):
+    """
+    Generate one dataset, unless data_dir already holds it for the same scale and seed.
+
+    Returns
+    -------
+    directory : str
+        Directory of the dataset, laid out like the project directory.
+    meta : dict
+        'rows' generated, input 'bytes' and the 'seconds' the generation took (0 when reused).
+    """
+    generator, subdirectory = DATASETS[name]
+    directory = os.path.join(data_dir, f"scale_{scale}", name)
+    meta_path = os.path.join(directory, DATASET_META)
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta["seed"] == seed:
+            return directory, {**meta, "seconds": 0.0}
+
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(os.path.join(directory, subdirectory))
+    # Generated in a worker process: a child's peak RSS starts from its parent's, so the runner has to stay small
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        rows = executor.submit(generator, os.path.join(directory, subdirectory), scale, seed).result()
+    meta = {"seed": seed, "rows": rows, "bytes": directory_bytes(directory),
+            "seconds": round(time.perf_counter() - start, 3)}
+    with open(meta_path, "w") as f:
+        json.dump(meta, f)
+    return directory, meta
+
+
+def run_step(step, directory, params):
+    """
+    Run one step in a child process and measure it.
+
+    Returns
+    -------
+    dict
+        'status' ('ok' or 'failed'), wall 'seconds', 'cpu_seconds' and 'peak_rss_mb'. os.wait4 reports the
+        resource usage of the child and of the workers it waited for, so CPU time covers every process of the step
+        and the peak is that of its largest process.
+    """
+    project = os.path.join(ROOT, step["project"])
+    command = [sys.executable] + [part.format(project=project, **params) for part in step["command"]]
+    if not command[1].startswith("-"):
+        command[1] = os.path.join(project, command[1])
+
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [project, ROOT, os.environ.get("PYTHONPATH")])),
+           "MPLBACKEND": "Agg"}
+    with open(os.path.join(directory, f"{step['name']}.log"), "w") as log:
+        start = time.perf_counter()
+        process = subprocess.Popen(command, cwd=directory, env=env, stdout=log, stderr=subprocess.STDOUT)
+        _, status, usage = os.wait4(process.pid, 0)
+        seconds = time.perf_counter() - start
+    return {
+        "status": "ok" if os.waitstatus_to_exitcode(status) == 0 else "failed",
+        "seconds": round(seconds, 3),
+        "cpu_seconds": round(usage.ru_utime + usage.ru_stime, 3),
+        "peak_rss_mb": round(usage.ru_maxrss / 1024, 1),
+    }
+
+
+def run_benchmarks(steps, scales, seed=0, data_dir=None, params=None, repeat=1):
+    """
+    Run the steps at every scale.
+
+    Parameters
+    ----------
+    steps : list of dict
+        Steps from STEPS. The step named in a step's 'after' runs first even if it is not selected, without being
+        reported.
+    scales : list of int
+        Multiples of the real datasets' sizes.
+    seed : int
+        Seed of the data generators.
+    data_dir : str, optional
+        Directory keeping the generated data between runs (default: a temporary directory).
+    params : dict, optional
+        Values substituted into the step commands ('strategy' and 'workers').
+    repeat : int
+        Runs of every step; the fastest run is kept.
+
+    Returns
+    -------
+    list of dict
+        One result per step and scale.
+    """
+    names = {step["name"] for step in steps}
+    steps = [step for step in STEPS if step["name"] in names or any(
+        other.get("after") == step["name"] for other in steps)]
+    results = []
+    with tempfile.TemporaryDirectory() as scratch:
+        for scale in scales:
+            for step in steps:
+                directory, meta = prepare_dataset(step["dataset"], scale, seed, data_dir or scratch)
+                runs = [run_step(step, directory, params or {}) for _ in range(repeat)]
+                best = min(runs, key=lambda run: (run["status"] != "ok", run["seconds"]))
+                if step["name"] not in names:
+                    continue
+                result = {"step": step["name"], "scale": scale, "rows": meta["rows"],
+                          "input_mb": round(meta["bytes"] / 2 ** 20, 2), "generate_seconds": meta["seconds"], **best,
+                          "rows_per_second": round(meta["rows"] / best["seconds"]) if best["seconds"] else None}
+                results.append(result)
+                print(f"{step['name']} at {scale}x: {best['status']}, {best['seconds']:.2f}s, "
+                      f"{best['peak_rss_mb']:.0f} MB peak RSS")
+    return results
+
+
+def compare(results, previous):
+    # Ratio of this run's time and peak memory to those of a previous run, for the steps and scales both ran
+    current = pd.DataFrame(results).set_index(["step", "scale"])
+    before = pd.DataFrame(previous["results"]).set_index(["step", "scale"])
+    joined = current[["seconds", "peak_rss_mb"]].join(before[["seconds", "peak_rss_mb"]], rsuffix="_before",
+                                                      how="inner")
+    joined["time_ratio"] = np.round(joined["seconds"] / joined["seconds_before"], 2)
+    joined["memory_ratio"] = np.round(joined["peak_rss_mb"] / joined["peak_rss_mb_before"], 2)
+    return joined
+
+
+if __name__ == "__main__":
+    step_names = [step["name"] for step in STEPS]
+    parser = argparse.ArgumentParser(description="Time and memory-profile the workflows on synthetic data.")
+    parser.add_argument("--step", nargs="+", choices=step_names, default=step_names)
+    parser.add_argument("--scale", nargs="+", type=int, default=[1],
+                        help="Multiples of the real dataset sizes (e.g. 1 100 10000)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=1, help="Runs of every step, the fastest is kept")
+    parser.add_argument("--data-dir", default=None, help="Keep the generated data here between runs")
+    parser.add_argument("--strategy", default="iterative", help="Imputation strategy of climate_impute")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes of climate_impute")
+    parser.add_argument("--output", default=None, help="Results file (default: results/benchmark_<time>.json)")
+    parser.add_argument("--compare", default=None, help="Results file of a previous run to compare against")
+    args = parser.parse_args()
+
+    selected = [step for step in STEPS if step["name"] in args.step]
+    run_at = time.strftime("%Y%m%dT%H%M%S")
+    results = run_benchmarks(selected, args.scale, seed=args.seed, data_dir=args.data_dir,
+                             params={"strategy": args.strategy, "workers": args.workers}, repeat=args.repeat)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"benchmark_{run_at}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "run_at": run_at,
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "cpu_count": os.cpu_count(),
+            "seed": args.seed,
+            "params": {"strategy": args.strategy, "workers": args.workers, "repeat": args.repeat},
+            "results": results,
+        }, f, indent=1)
+
+    print(pd.DataFrame(results).set_index(["step", "scale"]).to_string())
+    print(f"Results written to {output}")
+    if args.compare:
+        with open(args.compare) as f:
+            print(compare(results, json.load(f)).to_string())
+    if any(result["status"] == "failed" for result in results):
+        sys.exit(1)
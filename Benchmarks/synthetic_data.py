@@ -0,0 +1,306 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# The census shards come from the census benchmark's generator: US Census Data must be on sys.path, which the
+# entry point (run_benchmarks.py) sets up
+from benchmark_consolidate import write_shards
+
+# Seeded generators of synthetic inputs with the same schema as the real data files, sized by a scale factor:
+#   sales_data.csv                  2,823 order lines x scale
+#   states*.csv                     10 shards of 6 states x scale
+#   climate_data.csv                10 stations x 3 years of daily records x scale (plus station_detail.csv)
+#   observations.csv                4 parks x 5,824 species rows x scale (plus species_info.csv)
+# Value ranges, vocabularies and quirks (missing values, 'NA' territories, repeated scientific names, padded wind
+# directions, out-of-range sensor codes) follow the real files, so the workflows take the same code paths as on the
+# real data. Large scales are written in blocks of BLOCK_ROWS rows, each from its own seeded generator, so memory
+# stays flat and the output does not depend on the block size of the reader.
+
+BLOCK_ROWS = 1_000_000
+
+SALES_ROWS = 2823
+CENSUS_SHARDS = 10
+CLIMATE_STATIONS = 10
+CLIMATE_DAYS = 3 * 365
+SPECIES_ROWS = 5824
+
+PARKS = ["Great Smoky Mountains National Park", "Yosemite National Park", "Bryce National Park",
+         "Yellowstone National Park"]
+
+
+def block_rng(seed, block):
+    return np.random.default_rng([seed, 1, block])
+
+
+def catalog_rng(seed):
+    # Generator of the lookup tables (products, customers, stations) shared by every block
+    return np.random.default_rng([seed, 0])
+
+
+def write_blocks(path, total, make_block, seed, block_rows=BLOCK_ROWS):
+    # Writes `total` rows as CSV, block_rows at a time; make_block(rng, start, n) returns one block's frame
+    for block, start in enumerate(range(0, total, block_rows)):
+        frame = make_block(block_rng(seed, block), start, min(block_rows, total - start))
+        frame.to_csv(path, mode="w" if block == 0 else "a", header=block == 0, index=False)
+    return total
+
+
+# -------------------- Sales --------------------
+SALES_STATUSES = {"Shipped": 0.927, "Cancelled": 0.021, "Resolved": 0.017, "On Hold": 0.016, "In Process": 0.014,
+                  "Disputed": 0.005}
+PRODUCT_LINES = {"Classic Cars": 0.343, "Vintage Cars": 0.215, "Motorcycles": 0.117, "Planes": 0.108,
+                 "Trucks and Buses": 0.107, "Ships": 0.083, "Trains": 0.027}
+# Country -> (territory as written in the export, states, share of order lines)
+COUNTRIES = {
+    "USA": ("NA", ["CA", "MA", "NY", "PA", "CT", "NH", "NV", "NJ"], 0.356),
+    "Spain": ("EMEA", [""], 0.121), "France": ("EMEA", [""], 0.111), "Australia": ("APAC", ["NSW", "Victoria",
+                                                                                             "Queensland"], 0.066),
+    "UK": ("EMEA", ["", "Isle of Wight"], 0.051), "Italy": ("EMEA", [""], 0.04), "Finland": ("EMEA", [""], 0.033),
+    "Norway": ("EMEA", [""], 0.03), "Singapore": ("APAC", [""], 0.028), "Canada": ("NA", ["BC", "Quebec"], 0.025),
+    "Denmark": ("EMEA", [""], 0.022), "Germany": ("EMEA", [""], 0.022), "Sweden": ("EMEA", [""], 0.02),
+    "Austria": ("EMEA", [""], 0.019), "Japan": ("Japan", ["Tokyo", "Osaka"], 0.018), "Belgium": ("EMEA", [""], 0.012),
+    "Switzerland": ("EMEA", [""], 0.011), "Philippines": ("Japan", [""], 0.009), "Ireland": ("EMEA", [""], 0.006),
+}
+SUITES = ["Level 3", "Suite 400", "Level 6", "Level 15", "2nd Floor", "Suite 101", "Suite 750", "Floor No. 4"]
+SALES_DATES = pd.date_range("2003-01-06", "2005-05-31")
+SALES_DATE_TEXT = np.array([f"{d.month}/{d.day}/{d.year} 0:00" for d in SALES_DATES], dtype=object)
+
+
+def weighted(rng, weights, n):
+    keys = list(weights)
+    p = np.array([weights[key] for key in keys])
+    return np.array(keys, dtype=object)[rng.choice(len(keys), n, p=p / p.sum())]
+
+
+def sales_catalog(seed):
+    # Products and customers shared by every block: 109 product codes and 92 customers, as in the real export
+    rng = catalog_rng(seed)
+    products = pd.DataFrame({
+        "product_code": [f"S{size}_{number}" for size, number in
+                         zip(rng.choice([10, 12, 18, 24, 32, 50, 700, 72], 109), rng.choice(9000, 109, replace=False)
+                             + 1000)],
+        "product_line": weighted(rng, PRODUCT_LINES, 109),
+        "MSPR": rng.integers(33, 215, 109),
+    })
+
+    countries = weighted(rng, {country: share for country, (_, _, share) in COUNTRIES.items()}, 92)
+    customers = pd.DataFrame({
+        "customer_name": [f"{name} {kind}" for name, kind in
+                          zip(rng.choice(["Land of Toys", "Reims", "Mini Gifts", "Euro Shopping", "Auto Canal",
+                                          "Classic Legends", "Diecast", "Corporate Gift", "Toys4GrownUps",
+                                          "Vitachrome", "Dragon Souveniers", "Muscle Machine"], 92),
+                              [f"Collectables {i}" if i % 3 else f"Co. {i}" for i in range(92)])],
+        "phone": [f"{number:010d}" for number in rng.integers(2_000_000_000, 9_999_999_999, 92)],
+        "address_line_1": [f"{number} {street}" for number, street in
+                           zip(rng.integers(1, 9999, 92), rng.choice(["Long Airport Avenue", "rue de l'Abbaye",
+                                                                      "Hanover Sq.", "Berliner Str.",
+                                                                      "Seventh Ave.", "Strong St."], 92))],
+        "address_line_2": np.where(rng.random(92) < 0.1, rng.choice(SUITES, 92), ""),
+        "city": [f"City {i}" for i in rng.integers(0, 73, 92)],
+        "state": [rng.choice(COUNTRIES[country][1]) for country in countries],
+        "postal_code": np.where(rng.random(92) < 0.03, "", rng.integers(10000, 99999, 92).astype(str)),
+        "country": countries,
+        "territory": [COUNTRIES[country][0] for country in countries],
+        "contact_last_name": rng.choice(["Yu", "Henriot", "Da Cunha", "Young", "Brown", "Hirano", "Frick"], 92),
+        "contact_first_name": rng.choice(["Kwai", "Paul", "Daniel", "Julie", "Juri", "Michael", "Valarie"], 92),
+    })
+    return products, customers
+
+
+def sales_block(rng, start, n, products, customers):
+    # Order lines; an order has nine lines sharing its date, status and customer (blocks start on an order)
+    line = np.arange(start, start + n)
+    order = line // 9
+    order_ids = 10100 + order
+    first = order[0]
+    n_orders = order[-1] - first + 1
+    order_days = np.sort(rng.integers(0, len(SALES_DATES), n_orders))[order - first]
+    order_dates = SALES_DATES[order_days]
+    order_status = weighted(rng, SALES_STATUSES, n_orders)[order - first]
+    order_customer = rng.integers(0, len(customers), n_orders)[order - first]
+
+    product = products.iloc[rng.integers(0, len(products), n)].reset_index(drop=True)
+    quantity = rng.integers(6, 98, n)
+    unit_price = np.round(product["MSPR"].to_numpy() * rng.uniform(0.75, 1.15, n), 2)
+    sales = np.round(quantity * unit_price, 2)
+
+    frame = pd.DataFrame({
+        "order_id": order_ids,
+        "quantity_ordered": quantity,
+        "price_each": np.minimum(unit_price, 100.0),  # The export caps price_each at 100
+        "online_order_number": line % 9 + 1,
+        "sales": sales,
+        "order_date": SALES_DATE_TEXT[order_days],
+        "status": order_status,
+        "qtr_id": order_dates.quarter,
+        "month_id": order_dates.month,
+        "year_id": order_dates.year,
+        "product_line": product["product_line"],
+        "MSPR": product["MSPR"],
+        "product_code": product["product_code"],
+    })
+    customer = customers.iloc[order_customer].reset_index(drop=True)
+    frame = pd.concat([frame, customer], axis=1)
+    frame["deal_size"] = np.select([sales < 3000, sales <= 7000], ["Small", "Medium"], "Large")
+    return frame
+
+
+def write_sales(path, scale=1, seed=0):
+    """
+    Write a synthetic sales_data.csv.
+
+    Parameters
+    ----------
+    path : str
+        Output CSV path.
+    scale : int
+        Multiple of the real file's 2,823 order lines.
+    seed : int
+        Seed of the generator.
+
+    Returns
+    -------
+    int
+        Number of rows written.
+    """
+    products, customers = sales_catalog(seed)
+    return write_blocks(path, SALES_ROWS * scale, lambda rng, start, n: sales_block(rng, start, n, products, customers),
+                        seed, block_rows=BLOCK_ROWS // 9 * 9)
+
+
+# -------------------- Census --------------------
+def write_census(directory, scale=1, seed=0):
+    # states{i}.csv shards from the census benchmark's generator; returns the number of state rows written
+    write_shards(directory, CENSUS_SHARDS * scale, rows_per_shard=6, seed=seed)
+    return CENSUS_SHARDS * scale * 6
+
+
+# -------------------- Climate --------------------
+# Mean and standard deviation of the daily values of each measured column
+CLIMATE_COLUMNS = {"Tn": (23.5, 1.5), "Tx": (31.5, 2.0), "Tavg": (27.0, 1.3), "RH_avg": (81.0, 7.0),
+                   "ss": (5.0, 2.5), "ff_x": (5.0, 2.0), "ddd_x": (180.0, 100.0), "ff_avg": (2.0, 1.0)}
+WIND_DIRECTIONS = ["E", "SW", "NE", "W", "N", "NW", "S", "SE"]
+CLIMATE_START = pd.Timestamp("2010-01-01")
+
+
+def climate_block(rng, first_station, n_stations):
+    # Daily records of `n_stations` stations. Every tenth station only has one year of records (too few to be
+    # split), values are missing at random, and sensor codes 8888/9999 stand in for unmeasured values.
+    frames = []
+    for station in range(first_station, first_station + n_stations):
+        days = 365 if station % 10 == 9 else CLIMATE_DAYS
+        frame = pd.DataFrame({column: np.round(rng.normal(mean, std, days), 1)
+                              for column, (mean, std) in CLIMATE_COLUMNS.items()})
+        frame["RR"] = np.round(np.where(rng.random(days) < 0.5, 0, rng.gamma(0.8, 12, days)), 1)
+        frame["ddd_x"] = frame["ddd_x"].clip(0, 360).round()
+        frame["ddd_car"] = rng.choice(WIND_DIRECTIONS + ["C", "E ", "SW "], days)
+        measured = list(CLIMATE_COLUMNS) + ["RR"]
+        frame[measured] = frame[measured].mask(rng.random((days, len(measured))) < 0.08)
+        frame[measured] = frame[measured].mask(rng.random((days, len(measured))) < 0.005, 8888)
+        frame["ddd_car"] = frame["ddd_car"].mask(rng.random(days) < 0.08)
+        frame["date"] = (CLIMATE_START + pd.to_timedelta(np.arange(days), unit="D")).strftime("%d-%m-%Y")
+        frame["station_id"] = 96001 + station
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)[["date", "Tn", "Tx", "Tavg", "RH_avg", "RR", "ss", "ff_x", "ddd_x",
+                                                 "ff_avg", "ddd_car", "station_id"]]
+
+
+def write_climate(directory, scale=1, seed=0):
+    """
+    Write a synthetic climate_data.csv and station_detail.csv into `directory`.
+
+    Returns
+    -------
+    int
+        Number of daily records written.
+    """
+    n_stations = CLIMATE_STATIONS * scale
+    stations_per_block = max(1, BLOCK_ROWS // CLIMATE_DAYS)
+    path = os.path.join(directory, "climate_data.csv")
+    rows = 0
+    for block, first in enumerate(range(0, n_stations, stations_per_block)):
+        frame = climate_block(block_rng(seed, block), first, min(stations_per_block, n_stations - first))
+        frame.to_csv(path, mode="w" if block == 0 else "a", header=block == 0, index=False)
+        rows += len(frame)
+
+    rng = catalog_rng(seed)
+    pd.DataFrame({
+        "station_id": 96001 + np.arange(n_stations),
+        "station_name": [f"Stasiun Meteorologi {i}" for i in range(n_stations)],
+        "region_name": rng.choice(["Aceh", "Jawa Barat", "Bali", "Papua", "Sulawesi Selatan"], n_stations),
+        "latitude": np.round(rng.uniform(-10, 5, n_stations), 5),
+        "longitude": np.round(rng.uniform(95, 141, n_stations), 5),
+    }).to_csv(os.path.join(directory, "station_detail.csv"), index=False)
+    return rows
+
+
+# -------------------- NatPark biodiversity --------------------
+SPECIES_CATEGORIES = {"Vascular Plant": 0.768, "Bird": 0.089, "Nonvascular Plant": 0.057, "Mammal": 0.036,
+                      "Fish": 0.022, "Amphibian": 0.014, "Reptile": 0.014}
+CONSERVATION_STATUSES = {"": 0.967, "Species of Concern": 0.0276, "Endangered": 0.0024, "Threatened": 0.0017,
+                         "In Recovery": 0.0007}
+SYLLABLES = ["ca", "lo", "ne", "mi", "ra", "tu", "si", "ve", "po", "da", "gi", "xo", "bu", "fe", "ki", "zo"]
+NAME_WORDS = ["Red-Backed", "Vole", "American", "Bison", "Gapper's", "Northern", "Bat", "Fern", "Sedge", "Common",
+              "Eastern", "Moss", "Warbler", "Trout", "Salamander", "Snake", "Oak", "Aster", "Western", "Lily"]
+
+
+def latin(numbers, length):
+    # A distinct pseudo-latin word for every number below 16 ** length: its base-16 digits spelled as syllables,
+    # without leading zeros beyond the first two
+    words = np.full(len(numbers), "", dtype=object)
+    for digit in range(length):
+        spelled = np.array(SYLLABLES, dtype=object)[(numbers // 16 ** digit) % 16] + words
+        words = np.where((digit < 2) | (numbers >= 16 ** digit), spelled, words)
+    return words
+
+
+def species_block(rng, start, n):
+    # Species rows with unique scientific names, except that about 5% repeat another row's name under a different
+    # common name (as species_info.csv does)
+    numbers = np.arange(start, start + n)
+    names = pd.Series(latin(numbers // 64, 6)).str.capitalize() + " " + latin(numbers % 64 + numbers // 64, 3)
+    repeat = rng.random(n) < 0.05
+    names[repeat] = names.to_numpy()[rng.integers(0, n, repeat.sum())]
+
+    words = np.array(NAME_WORDS, dtype=object)
+    common = words[rng.integers(0, len(words), n)] + " " + words[rng.integers(0, len(words), n)]
+    second = rng.random(n) < 0.3
+    common[second] = common[second] + ", " + words[rng.integers(0, len(words), second.sum())]
+    return pd.DataFrame({
+        "category": weighted(rng, SPECIES_CATEGORIES, n),
+        "scientific_name": names,
+        "common_names": common,
+        "conservation_status": weighted(rng, CONSERVATION_STATUSES, n),
+    })
+
+
+def write_biodiversity(directory, scale=1, seed=0):
+    """
+    Write a synthetic species_info.csv and observations.csv into `directory`.
+
+    Every species row is observed once in each park, with observation counts in the real file's range; the
+    observation rows are shuffled within each block.
+
+    Returns
+    -------
+    int
+        Number of observation rows written.
+    """
+    total = SPECIES_ROWS * scale
+    species_rows = max(1, BLOCK_ROWS // len(PARKS))
+    rows = 0
+    for block, start in enumerate(range(0, total, species_rows)):
+        rng = block_rng(seed, block)
+        species = species_block(rng, start, min(species_rows, total - start))
+        observations = pd.DataFrame({
+            "scientific_name": np.tile(species["scientific_name"].to_numpy(), len(PARKS)),
+            "park_name": np.repeat(PARKS, len(species)),
+            "observations": np.clip(rng.normal(142, 70, len(species) * len(PARKS)), 9, 321).astype("int64"),
+        }).iloc[rng.permutation(len(species) * len(PARKS))]
+
+        mode, header = ("w", True) if block == 0 else ("a", False)
+        species.to_csv(os.path.join(directory, "species_info.csv"), mode=mode, header=header, index=False)
+        observations.to_csv(os.path.join(directory, "observations.csv"), mode=mode, header=header, index=False)
+        rows += len(observations)
+    return rows
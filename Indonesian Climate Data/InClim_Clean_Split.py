@@ -1,76 +1,138 @@
-import pandas as pd
-import numpy as np
-
-
-pd.set_option('display.max_columns', None)
-pd.options.display.max_rows = 999
-
-# This script takes care of general data cleaning (renaming columns, removing outliers, etc.) and splits the dataframe
-# in order to more effectively fill in missing values with IterativeImputer.
-
-# Load the dataset from a CSV file
-df = pd.read_csv("climate_data.csv")
-
-# Rename columns for better readability
-df.rename(columns={
-    "Tn": "min_temp",
-    "Tx": "max_temp",
-    "Tavg": "avg_temp",
-    "RH_avg": "avg_humidity",
-    "RR": "rainfall",
-    "ss": "sunshine",
-    "ff_x": "max_wind",
-    "ddd_x": "wind_dir_at_max",
-    "ff_avg": "avg_wind",
-    "ddd_car": "most_wind_dir"
-}, inplace=True)
-
-# Count how many records exist for each station
-sub500_stations = df["station_id"].value_counts()
-
-# Select station IDs that have fewer than 500 records
-sub500_stations = sub500_stations[sub500_stations < 500].index
-
-# Remove rows belonging to those stations with fewer than 500 records
-df = df[~df["station_id"].isin(sub500_stations)]
-
-# Clean whitespace in the 'most_wind_dir' column (important for categorical values)
-df["most_wind_dir"] = df["most_wind_dir"].str.strip()
-
-# Define acceptable ranges (filters) for each variable to remove outliers
-outliers = {
-    'min_temp': lambda x: x <= 30,  # Minimum temperature capped at 30
-    'max_temp': lambda x: x <= 50,  # Maximum temperature capped at 50
-    'avg_temp': lambda x: x <= 40,  # Average temperature capped at 40
-    'avg_humidity': lambda x: (x >= 60) & (x <= 100),  # Humidity must be between 60–100%
-    'sunshine': lambda x: (x > 0) & (x <= 10),  # Sunshine duration between 0–10
-    'max_wind': lambda x: (x > 0) & (x < 26),  # Max wind speed between 0–25
-    'wind_dir_at_max': lambda x: x <= 360,  # Wind direction (degrees) within compass range
-    'avg_wind': lambda x: (x > 0) & (x <= 15),  # Average wind speed between 0–15
-    'most_wind_dir': lambda x: x.isin(['E', 'SW', 'NE', 'W', 'N', 'NW', 'S', 'SE'])  # Valid compass directions
-}
-
-# Apply outlier filtering: replace invalid values with NaN
-for col, outlier in outliers.items():
-    df[col] = df[col].where(outlier(df[col]))
-
-# I will handle the missing data using IterativeImputer in a future step.
-# For more accurate estimates, the dataframe will be divided by station ID, ensuring imputation is performed within
-# each station's data.
-
-# Get list of station IDs and create a for loop to iterate though them
-station_id_list = df['station_id'].unique()
-for sid in station_id_list:
-    station_df = df[df['station_id'] == sid]  # Extract data for a single station
-
-    # Calculate percentage of missing values per column
-    missing_percent = station_df.isnull().sum() / len(station_df) * 100
-
-    # If any column has ≥ 85% missing values, flag the station
-    if (missing_percent >= 85).any():
-        print(f"Issue with station {sid}:\n {missing_percent}%")
-    else:
-        # Otherwise, save station data as a separate CSV file
-        station_df.to_csv(f'station_datasets/station_{sid}.csv', index=False)
-
-
+import argparse
+import pandas as pd
+
+from outlier_rules import apply_rules, load_rules
+from quality_report import build_report, merge_summaries, missing_percent, partial_summary, write_report
+from station_io import append_stations, remove_station, write_station_index, write_stations
+
+
+pd.set_option('display.max_columns', None)
+pd.options.display.max_rows = 999
+
+# This script takes care of general data cleaning (renaming columns, removing outliers, etc.) and splits the dataframe
+# in order to more effectively fill in missing values with IterativeImputer.
+# With --chunk-size the input is streamed in two passes instead of being loaded whole: the first pass only reads
+# 'station_id' to count records per station, the second cleans each chunk and appends it to the station partitions.
+# Peak memory then depends on the chunk size, not on the size of climate_data.csv.
+
+INPUT_FILE = "climate_data.csv"
+OUTPUT_DIR = "station_datasets"
+
+# Columns renamed for better readability
+COLUMN_NAMES = {
+    "Tn": "min_temp",
+    "Tx": "max_temp",
+    "Tavg": "avg_temp",
+    "RH_avg": "avg_humidity",
+    "RR": "rainfall",
+    "ss": "sunshine",
+    "ff_x": "max_wind",
+    "ddd_x": "wind_dir_at_max",
+    "ff_avg": "avg_wind",
+    "ddd_car": "most_wind_dir"
+}
+
+MIN_RECORDS = 500
+MAX_MISSING_PERCENT = 85
+
+
+def clean(df, keep_stations, rules):
+    # Renames, drops stations that were not kept and applies the outlier rules. Returns the cleaned rows and the
+    # number of values each rule removed per station.
+    df = df.rename(columns=COLUMN_NAMES)
+    df = df[df["station_id"].isin(keep_stations)].copy()
+
+    # Clean whitespace in the 'most_wind_dir' column (important for categorical values)
+    df["most_wind_dir"] = df["most_wind_dir"].str.strip()
+
+    # Apply the outlier rules from the config: replace invalid values with NaN
+    return df, apply_rules(df, rules)
+
+
+def flag_stations(missing_percent):
+    # If any column has ≥ 85% missing values, flag the station
+    flagged = (missing_percent >= MAX_MISSING_PERCENT).any(axis=1)
+    for sid in flagged[flagged].index:
+        print(f"Issue with station {sid}:\n {missing_percent.loc[sid]}%")
+    return flagged[flagged].index
+
+
+def station_index(record_counts, flagged):
+    index = record_counts.rename("records").rename_axis("station_id").reset_index()
+    index["status"] = "split"
+    index.loc[index["records"] < MIN_RECORDS, "status"] = "too_few_records"
+    index.loc[index["station_id"].isin(flagged), "status"] = "too_many_missing"
+    return index
+
+
+def split_in_memory(rules, fmt):
+    # Load the dataset from a CSV file
+    df = pd.read_csv(INPUT_FILE)
+
+    # Count how many records exist for each station and keep those with at least 500 records
+    record_counts = df["station_id"].value_counts()
+    df, outlier_counts = clean(df, record_counts[record_counts >= MIN_RECORDS].index, rules)
+
+    # I will handle the missing data using IterativeImputer in a future step.
+    # For more accurate estimates, the dataframe will be divided by station ID, ensuring imputation is performed
+    # within each station's data.
+
+    # Count missing values per column (and the other quality stats) for every station in one grouped pass
+    summary = partial_summary(df)
+    flagged = flag_stations(missing_percent(summary))
+
+    # Otherwise, save the station data, writing all station partitions in a single pass
+    write_stations(df[~df["station_id"].isin(flagged)], OUTPUT_DIR, fmt=fmt)
+    return outlier_counts, station_index(record_counts, flagged), summary
+
+
+def split_streaming(rules, fmt, chunk_size):
+    # First pass: count records per station, reading only the 'station_id' column
+    record_counts = pd.Series(dtype="int64")
+    for chunk in pd.read_csv(INPUT_FILE, usecols=["station_id"], chunksize=chunk_size):
+        record_counts = record_counts.add(chunk["station_id"].value_counts(), fill_value=0)
+    record_counts = record_counts.astype("int64")
+    keep_stations = record_counts[record_counts >= MIN_RECORDS].index
+
+    # Second pass: clean each chunk and append it to the station partitions, keeping running totals of missing
+    # values and outlier rejections per station
+    outlier_counts, summary = None, None
+    started = set()
+    for part, chunk in enumerate(pd.read_csv(INPUT_FILE, chunksize=chunk_size)):
+        chunk, chunk_outliers = clean(chunk, keep_stations, rules)
+        outlier_counts = chunk_outliers if outlier_counts is None else outlier_counts.add(chunk_outliers,
+                                                                                           fill_value=0)
+        summary = merge_summaries(summary, partial_summary(chunk))
+        append_stations(chunk, OUTPUT_DIR, part, started, fmt=fmt)
+
+    if summary is None:
+        return pd.DataFrame(), station_index(record_counts, []), pd.DataFrame()
+
+    # Stations that turn out to be mostly empty are removed again once every chunk has been seen
+    flagged = flag_stations(missing_percent(summary))
+    for sid in flagged:
+        remove_station(OUTPUT_DIR, sid)
+    return outlier_counts.astype("int64"), station_index(record_counts, flagged), summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Clean the climate dataset and split it by station.")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv",
+                        help="Write one CSV per station or a Parquet dataset partitioned by station_id")
+    parser.add_argument("--rules", default="outlier_rules.json", help="Outlier rule config")
+    parser.add_argument("--chunk-size", type=int, default=None,
+                        help="Stream climate_data.csv in chunks of this many rows instead of loading it whole")
+    args = parser.parse_args()
+
+    rules = load_rules(args.rules)
+    if args.chunk_size:
+        outlier_counts, index, summary = split_streaming(rules, args.format, args.chunk_size)
+    else:
+        outlier_counts, index, summary = split_in_memory(rules, args.format)
+
+    # Keep count of how many values each outlier rule removed per station, a station index so later steps
+    # don't need to read climate_data.csv to list the stations, and the station data-quality report
+    outlier_counts.to_csv("outlier_rejections.csv")
+    write_station_index(index)
+    if not summary.empty:
+        write_report(build_report(summary, outlier_counts, index))
@@ -1,59 +1,145 @@
-import pandas as pd
-import numpy as np
-from sklearn.experimental import enable_iterative_imputer
-from sklearn.impute import IterativeImputer
-from sklearn.model_selection import train_test_split
-
-# This script imputes missing climate station data using IterativeImputer and saves completed station datasets
-
-# Load the original climate dataset
-df = pd.read_csv("climate_data.csv")
-
-# Get a list of station IDs based on frequency of occurrence
-station_id_list = df["station_id"].unique()
-
-# Loop through each station dataset
-for sid in station_id_list:
-    try:
-        # Load the pre-cleaned CSV file for the current station
-        df = pd.read_csv(f'station_datasets/station_{sid}.csv')
-
-        # Select only the columns with data I want to fill in
-        imputedf = df[["min_temp", "max_temp", "avg_temp", "avg_humidity",
-                       "sunshine", "max_wind", "wind_dir_at_max", "avg_wind"]]
-
-        # Split the data into training and testing sets (80% / 20%)
-        traindf, testdf = train_test_split(imputedf, test_size=0.2)
-
-        # Initialize IterativeImputer (multi-variate imputation method)
-        imp = IterativeImputer(max_iter=50, random_state=0)
-
-        # Fit imputer on the full dataset (learn imputation model)
-        imp.fit(imputedf)
-
-        # Impute missing values for the training set and round to 1 decimal
-        traindf_imp = pd.DataFrame(np.round(imp.transform(traindf), 1),
-                                   columns=traindf.columns)
-
-        # Impute missing values for the test set and round to 1 decimal
-        testdf_imp = pd.DataFrame(np.round(imp.transform(testdf), 1),
-                                  columns=testdf.columns)
-
-        # Impute missing values for the complete dataset
-        compdf = pd.DataFrame(np.round(imp.transform(imputedf), 1),
-                              columns=imputedf.columns,
-                              index=imputedf.index)
-
-        # Replace the original columns in df with the imputed values
-        df.loc[compdf.index, compdf.columns] = compdf
-
-        # Save the completed dataset to a new folder
-        df.to_csv(f'station_ds_complete/station_{sid}.csv', index=False)
-
-    except Exception as e:
-        # If any error occurs (e.g., missing file or corrupted data), print message
-        print(f"Error in DS {sid}: {e}")
-
-
-
-
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import numpy as np
+
+from imputers import IMPUTE_COLUMNS, STRATEGIES, make_strategy
+from station_io import read_station, read_station_ids, station_hash
+from station_matrix import MATRIX_DIR, StationMatrix
+
+# This script imputes missing climate station data (IterativeImputer by default, see imputers.py for the other
+# strategies) and saves completed station datasets.
+# Stations are imputed in parallel worker processes. A manifest records the content hash of every station's
+# cleaned input, and of the neighbouring stations the strategy reads (knn), together with the imputer settings, so
+# stations whose inputs have not changed since the last run are skipped. Per-station timing and convergence stats
+# are written alongside the completed datasets.
+# With --matrix, the knn strategy reads neighbouring stations from the memory-mapped station matrix (built or
+# refreshed before the workers start) instead of every worker parsing its neighbours' CSV files.
+
+INPUT_DIR = "station_datasets"
+OUTPUT_DIR = "station_ds_complete"
+MANIFEST_FILE = os.path.join(OUTPUT_DIR, "manifest.json")
+STATS_FILE = os.path.join(OUTPUT_DIR, "imputation_stats.csv")
+
+
+def settings_hash(strategy):
+    settings = {"columns": IMPUTE_COLUMNS, "strategy": strategy.name, "imputer": strategy.params}
+    return hashlib.sha256(json.dumps(settings, sort_keys=True).encode()).hexdigest()
+
+
+def neighbour_hashes(sid, strategy):
+    # Content hashes of the other stations the strategy reads for `sid` (None for a neighbour that was not split).
+    # The station matrix is refreshed from these same files before the workers start, so they also cover --matrix.
+    hashes = {}
+    for neighbour in strategy.neighbours(sid):
+        try:
+            hashes[str(neighbour)] = station_hash(INPUT_DIR, neighbour)
+        except FileNotFoundError:
+            hashes[str(neighbour)] = None
+    return hashes
+
+
+def impute_station(sid, strategy):
+    # Imputes one station and returns its stats row. Errors are recorded rather than raised so one bad
+    # station does not stop the rest of the pool.
+    stats = {"station_id": sid, "strategy": strategy.name, "rows": 0, "missing_values": 0, "n_iter": None,
+             "converged": None, "seconds": None, "error": ""}
+    start = time.perf_counter()
+    try:
+        # Load the pre-cleaned data for the current station
+        stats["input_hash"] = station_hash(INPUT_DIR, sid)
+        stats["neighbour_hashes"] = neighbour_hashes(sid, strategy)
+        df = read_station(INPUT_DIR, sid)
+        imputedf = df[IMPUTE_COLUMNS]
+        stats["rows"] = len(df)
+        stats["missing_values"] = int(imputedf.isnull().sum().sum())
+
+        # Impute the full dataset in one pass, rounding to 1 decimal
+        completed, strategy_stats = strategy.impute(df, sid)
+        stats.update(strategy_stats)
+
+        # Replace the original columns in df with the imputed values and save to the completed folder
+        df[IMPUTE_COLUMNS] = np.round(completed, 1)
+        df.to_csv(os.path.join(OUTPUT_DIR, f"station_{sid}.csv"), index=False)
+    except Exception as e:
+        # If any error occurs (e.g., missing file or corrupted data), record and print it
+        stats["error"] = str(e)
+        print(f"Error in DS {sid}: {e}")
+    stats["seconds"] = round(time.perf_counter() - start, 3)
+    return stats
+
+
+def load_manifest():
+    if not os.path.exists(MANIFEST_FILE):
+        return {}
+    with open(MANIFEST_FILE) as f:
+        return json.load(f)
+
+
+def is_unchanged(sid, manifest, settings, strategy):
+    entry = manifest.get(str(sid))
+    output_path = os.path.join(OUTPUT_DIR, f"station_{sid}.csv")
+    if entry is None or entry["settings_hash"] != settings or not os.path.exists(output_path):
+        return False
+    try:
+        return (entry["input_hash"] == station_hash(INPUT_DIR, sid)
+                and entry.get("neighbour_hashes", {}) == neighbour_hashes(sid, strategy))
+    except FileNotFoundError:
+        return False
+
+
+def impute_stations(station_id_list, strategy, workers=None, force=False):
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    manifest = load_manifest()
+    settings = settings_hash(strategy)
+
+    pending = [sid for sid in station_id_list if force or not is_unchanged(sid, manifest, settings, strategy)]
+    print(f"Imputing {len(pending)} of {len(station_id_list)} stations")
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(impute_station, pending, [strategy] * len(pending),
+                                    chunksize=max(1, len(pending) // 64)))
+
+    for stats in results:
+        if not stats["error"]:
+            manifest[str(stats["station_id"])] = {"input_hash": stats["input_hash"],
+                                                  "neighbour_hashes": stats["neighbour_hashes"],
+                                                  "settings_hash": settings}
+    with open(MANIFEST_FILE, "w") as f:
+        json.dump(manifest, f, indent=1)
+
+    stats = pd.DataFrame(results, columns=["station_id", "strategy", "rows", "missing_values", "n_iter", "converged",
+                                           "seconds", "error"])
+    if os.path.exists(STATS_FILE):
+        previous = pd.read_csv(STATS_FILE)
+        stats = pd.concat([previous[~previous["station_id"].isin(stats["station_id"])], stats])
+    stats.to_csv(STATS_FILE, index=False)
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Impute missing values for every climate station.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--force", action="store_true", help="Re-impute stations even if they are unchanged")
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES), default="iterative")
+    parser.add_argument("--tol", type=float, default=1e-3,
+                        help="Early-stopping tolerance for the iterative strategy")
+    parser.add_argument("--matrix", action="store_true",
+                        help="Read knn neighbours from the memory-mapped station matrix")
+    args = parser.parse_args()
+
+    # Get the list of station IDs from the station index written by InClim_Clean_Split.py
+    station_ids = read_station_ids()
+
+    params = {"tol": args.tol} if args.strategy == "iterative" else {}
+    if args.matrix and args.strategy == "knn":
+        StationMatrix.open(station_ids, INPUT_DIR, MATRIX_DIR)
+        params["matrix_dir"] = MATRIX_DIR
+    strategy = make_strategy(args.strategy, **params)
+
+    impute_stations(station_ids, strategy, workers=args.workers, force=args.force)
@@ -1,13 +1,17 @@
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-
-main_df = pd.read_csv("climate_data.csv")
-station_id_list = main_df["station_id"].unique()
-
-for sid in station_id_list:
-    try:
-        df = pd.read_csv(f"station_datasets/station_{sid}.csv")
-        print(f"\n\n station_{sid}\n",df.isnull().sum()/len(df)*100)
-    except: print("Error in DS {}\n\n\n".format(sid))
+import pandas as pd
+
+from quality_report import QUALITY_FILE
+
+# Prints the station data-quality report (missing-value percentages, rule rejections, record counts and date
+# coverage) written by InClim_Clean_Split.py or quality_report.py, instead of re-reading every station file.
+
+pd.set_option('display.max_columns', None)
+pd.options.display.max_rows = 999
+
+try:
+    report = pd.read_csv(QUALITY_FILE, index_col="station_id")
+except FileNotFoundError:
+    print(f"{QUALITY_FILE} was not found, run InClim_Clean_Split.py or quality_report.py first.")
+else:
+    for sid, station in report.iterrows():
+        print(f"\n\n station_{sid}\n", station)
@@ -0,0 +1,74 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+from imputers import IMPUTE_COLUMNS, make_strategy
+from station_io import read_station, read_station_ids
+
+# Compares the imputation strategies on accuracy and runtime. For every station the rows are split 80/20 with
+# train_test_split, and in each held-out row `cells_per_row` randomly chosen observed values are hidden (always
+# leaving at least one observed value in the row, so the multivariate strategies have something to condition on).
+# The station is imputed and only the hidden cells are scored against their true values.
+
+CANDIDATES = {
+    "iterative": {},
+    "iterative (tol=1e-2)": {"tol": 1e-2},
+    "interpolate": {},
+    "knn": {},
+}
+
+
+def held_out_cells(df, cells_per_row=1, random_state=0):
+    # Boolean (rows, IMPUTE_COLUMNS) mask of the cells to hide: up to `cells_per_row` random observed cells in
+    # each held-out row, leaving at least one observed value per row (rows with one observed value are skipped)
+    _, test_rows = train_test_split(np.arange(len(df)), test_size=0.2, random_state=random_state)
+    observed = df[IMPUTE_COLUMNS].notna().to_numpy()
+    keys = np.random.default_rng(random_state).random(observed.shape)
+    keys[~observed] = np.inf
+    rank = np.argsort(np.argsort(keys, axis=1), axis=1)
+    hidden_per_row = np.minimum(cells_per_row, observed.sum(axis=1) - 1)
+    held_out = np.zeros(len(df), dtype=bool)
+    held_out[test_rows] = True
+    return observed & (rank < hidden_per_row[:, None]) & held_out[:, None]
+
+
+def evaluate(name, params, station_ids, input_dir, cells_per_row=1):
+    strategy = make_strategy(name.split(" ")[0], **params)
+    errors, seconds = [], 0.0
+    for sid in station_ids:
+        df = read_station(input_dir, sid)
+        hidden = held_out_cells(df, cells_per_row)
+
+        truth = df[IMPUTE_COLUMNS]
+        masked = df.copy()
+        masked[IMPUTE_COLUMNS] = truth.mask(hidden)
+
+        start = time.perf_counter()
+        completed, _ = strategy.impute(masked, sid)
+        seconds += time.perf_counter() - start
+
+        # NaN everywhere but the hidden cells, so only those are scored
+        errors.append((completed[IMPUTE_COLUMNS] - truth).abs().where(hidden))
+
+    errors = pd.concat(errors)
+    result = errors.mean().rename(lambda col: f"mae_{col}")
+    result["mae_overall"] = errors.stack().mean()
+    result["seconds"] = seconds
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the station imputation strategies.")
+    parser.add_argument("--input-dir", default="station_datasets")
+    parser.add_argument("--stations", type=int, default=None, help="Only use the first N stations")
+    parser.add_argument("--cells-per-row", type=int, default=1, help="Observed values hidden in each held-out row")
+    args = parser.parse_args()
+
+    station_ids = read_station_ids()[:args.stations]
+    results = pd.DataFrame({name: evaluate(name, params, station_ids, args.input_dir, args.cells_per_row)
+                            for name, params in CANDIDATES.items()}).T
+    print(results[["mae_overall", "seconds"]].sort_values("seconds"))
+    results.to_csv("imputer_benchmark.csv")
@@ -0,0 +1,146 @@
+import os
+import warnings
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from sklearn.exceptions import ConvergenceWarning
+from sklearn.experimental import enable_iterative_imputer
+from sklearn.impute import IterativeImputer, KNNImputer
+
+from station_io import DATE_FORMAT, read_station
+
+# Imputation strategies for the climate stations. Every strategy takes one station's cleaned frame and returns the
+# IMPUTE_COLUMNS block with its missing values filled, plus a dict of run stats. `neighbours(sid)` lists the other
+# stations whose data the imputation of `sid` reads, so callers can tell when a result is out of date.
+
+# Columns with data I want to fill in
+IMPUTE_COLUMNS = ["min_temp", "max_temp", "avg_temp", "avg_humidity",
+                  "sunshine", "max_wind", "wind_dir_at_max", "avg_wind"]
+
+STATION_DETAIL_FILE = "station_detail.csv"
+
+
+class IterativeStrategy:
+    """Multivariate imputation with IterativeImputer; stops early once the change between rounds is below `tol`."""
+    name = "iterative"
+
+    def __init__(self, max_iter=50, tol=1e-3, random_state=0):
+        self.params = {"max_iter": max_iter, "tol": tol, "random_state": random_state}
+
+    def neighbours(self, sid):
+        return []
+
+    def impute(self, df, sid=None):
+        imp = IterativeImputer(**self.params)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", ConvergenceWarning)
+            completed = imp.fit_transform(df[IMPUTE_COLUMNS])
+        stats = {"n_iter": imp.n_iter_, "converged": imp.n_iter_ < self.params["max_iter"]}
+        return pd.DataFrame(completed, columns=IMPUTE_COLUMNS, index=df.index), stats
+
+
+class InterpolationStrategy:
+    """
+    Time-ordered imputation. Gaps of up to `max_gap` consecutive missing days (counting dates with no row at all)
+    are filled by interpolating in time between the neighbouring observations; longer gaps are left whole and,
+    like everything else still missing, fall back to the station's mean for that day of the year, then to the
+    column mean. Rows without a valid date only get the column mean.
+    """
+    name = "interpolate"
+
+    def __init__(self, max_gap=7):
+        self.params = {"max_gap": max_gap}
+
+    def neighbours(self, sid):
+        return []
+
+    def impute(self, df, sid=None):
+        dates = pd.to_datetime(df["date"], format=DATE_FORMAT, errors="coerce")
+        dated = dates.notna().to_numpy()
+        order = np.argsort(dates[dated].to_numpy(), kind="stable")
+        days = pd.DatetimeIndex(dates[dated].iloc[order])
+        labels = df.index[dated][order]
+        block = df[IMPUTE_COLUMNS].loc[labels].set_axis(days)
+
+        # Length in days of the gap around every missing value: the days strictly between the previous and the
+        # next observation of the column (NaN before the first and after the last one)
+        observed = block.notna().to_numpy()
+        observed_days = pd.DataFrame(np.where(observed, days.to_numpy()[:, None], np.datetime64("NaT")),
+                                     columns=IMPUTE_COLUMNS)
+        gap_days = (observed_days.bfill() - observed_days.ffill()) / pd.Timedelta(days=1) - 1
+        fillable = observed | (gap_days.to_numpy() <= self.params["max_gap"])
+
+        filled = block.interpolate(method="time", limit_area="inside").where(fillable)
+        filled = filled.fillna(block.groupby(days.dayofyear).transform("mean"))
+        filled = filled.set_axis(labels).reindex(df.index)
+        return filled.fillna(df[IMPUTE_COLUMNS].mean()), {}
+
+
+class KNNStrategy:
+    """
+    KNN imputation. Donor rows come from the station itself and, when station_detail.csv gives station
+    coordinates, from its `neighbour_stations` nearest stations. With `matrix_dir`, neighbours are read from the
+    memory-mapped station matrix (see station_matrix.py) instead of parsing their CSV files.
+    """
+    name = "knn"
+
+    def __init__(self, n_neighbors=5, neighbour_stations=3, input_dir="station_datasets", matrix_dir=None):
+        self.params = {"n_neighbors": n_neighbors, "neighbour_stations": neighbour_stations}
+        self.input_dir = input_dir
+        self.matrix_dir = matrix_dir
+
+    def neighbours(self, sid):
+        return nearest_stations(sid, self.params["neighbour_stations"])
+
+    def neighbour_block(self, neighbour):
+        # The neighbour's IMPUTE_COLUMNS as an array, or None when the station was not split
+        if self.matrix_dir is not None:
+            from station_matrix import shared_matrix  # station_matrix imports this module
+            matrix = shared_matrix(self.matrix_dir)
+            return matrix.station_values(neighbour) if neighbour in matrix else None
+        try:
+            return read_station(self.input_dir, neighbour)[IMPUTE_COLUMNS].to_numpy(dtype="float64")
+        except FileNotFoundError:
+            return None
+
+    def impute(self, df, sid=None):
+        donors = [df[IMPUTE_COLUMNS].to_numpy(dtype="float64")]
+        for neighbour in self.neighbours(sid):
+            block = self.neighbour_block(neighbour)
+            if block is not None:
+                donors.append(block)
+
+        # Column-major like the frames' arrays: the distances (and so ties between donors) depend on the layout,
+        # and this keeps results identical whether neighbours come from CSV files or the station matrix
+        imp = KNNImputer(n_neighbors=self.params["n_neighbors"], keep_empty_features=True)
+        imp.fit(np.asfortranarray(np.concatenate(donors)))
+        completed = imp.transform(df[IMPUTE_COLUMNS].to_numpy(dtype="float64"))
+        return pd.DataFrame(completed, columns=IMPUTE_COLUMNS, index=df.index), {"donor_stations": len(donors) - 1}
+
+
+STRATEGIES = {strategy.name: strategy for strategy in [IterativeStrategy, InterpolationStrategy, KNNStrategy]}
+
+
+def make_strategy(name, **params):
+    return STRATEGIES[name](**params)
+
+
+@lru_cache(maxsize=None)
+def station_coordinates(detail_file=STATION_DETAIL_FILE):
+    # Read once per process and shared by every station the process imputes
+    return pd.read_csv(detail_file, usecols=["station_id", "latitude", "longitude"]).set_index("station_id")
+
+
+def nearest_stations(sid, k, detail_file=STATION_DETAIL_FILE):
+    # The k stations closest to `sid` by great-circle distance, or none when there are no station coordinates
+    if sid is None or k == 0 or not os.path.exists(detail_file):
+        return []
+    detail = station_coordinates(detail_file)
+    if sid not in detail.index:
+        return []
+    lat, lon = np.radians(detail["latitude"].to_numpy()), np.radians(detail["longitude"].to_numpy())
+    lat0, lon0 = np.radians(detail.loc[sid, ["latitude", "longitude"]].to_numpy(dtype=float))
+    distance = np.arccos(np.clip(np.sin(lat0) * np.sin(lat) + np.cos(lat0) * np.cos(lat) * np.cos(lon - lon0), -1, 1))
+    nearest = detail.index[np.argsort(distance)]
+    return [station for station in nearest if station != sid][:k]
@@ -0,0 +1,66 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+# Declarative outlier rules for the climate cleaner. Each rule in the config maps a column to either numeric
+# bounds ("min"/"max", inclusive unless "min_inclusive"/"max_inclusive" is false) or a set of allowed
+# categories ("allowed"). Values that break a rule are replaced with NaN.
+
+
+def load_rules(path="outlier_rules.json"):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compile_rules(rules):
+    # Splits the rules into one bounds table for the numeric columns and a dict of category rules
+    numeric = {col: rule for col, rule in rules.items() if "allowed" not in rule}
+    categorical = {col: set(rule["allowed"]) for col, rule in rules.items() if "allowed" in rule}
+    bounds = pd.DataFrame({
+        "min": [rule.get("min", -np.inf) for rule in numeric.values()],
+        "max": [rule.get("max", np.inf) for rule in numeric.values()],
+        "min_inclusive": [rule.get("min_inclusive", True) for rule in numeric.values()],
+        "max_inclusive": [rule.get("max_inclusive", True) for rule in numeric.values()],
+    }, index=list(numeric))
+    return bounds, categorical
+
+
+def apply_rules(df, rules):
+    """
+    Replace values that break the outlier rules with NaN.
+
+    The numeric columns are checked together as one 2D block against the compiled bounds, so every numeric rule
+    is applied in a single vectorized pass.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Climate data with renamed columns and a 'station_id' column. Modified in place.
+    rules : dict
+        Rule spec as returned by load_rules.
+
+    Returns
+    -------
+    pd.DataFrame
+        Number of values each rule removed, with one row per station and one column per rule.
+    """
+    bounds, categorical = compile_rules(rules)
+    columns = list(bounds.index)
+
+    block = df[columns].to_numpy(dtype="float64", na_value=np.nan, copy=True)
+    lower = bounds["min"].to_numpy()
+    upper = bounds["max"].to_numpy()
+    above_min = np.where(bounds["min_inclusive"].to_numpy(), block >= lower, block > lower)
+    below_max = np.where(bounds["max_inclusive"].to_numpy(), block <= upper, block < upper)
+    rejected = ~np.isnan(block) & ~(above_min & below_max)
+    block[rejected] = np.nan
+    df[columns] = block
+
+    rejections = pd.DataFrame(rejected, columns=columns, index=df.index)
+    for col, allowed in categorical.items():
+        invalid = df[col].notna() & ~df[col].isin(allowed)
+        df.loc[invalid, col] = np.nan
+        rejections[col] = invalid
+
+    return rejections.groupby(df["station_id"]).sum()
@@ -0,0 +1,122 @@
+import argparse
+import os
+
+import pandas as pd
+
+from station_io import DATE_FORMAT, STATION_INDEX_FILE, station_path
+
+# Station data-quality report: record counts, missing-value percentages, outlier rule rejections and date coverage
+# for every station, in one summary table. InClim_Clean_Split.py builds it during its single scan of the data; this
+# script can also rebuild it from the split station datasets, reading only the footers of Parquet partitions.
+
+QUALITY_FILE = "station_quality.csv"
+REJECTIONS_FILE = "outlier_rejections.csv"
+
+
+def partial_summary(df):
+    # Additive per-station counts for a frame (or chunk) of cleaned rows; combine chunks with merge_summaries
+    stations = df["station_id"]
+    dates = pd.to_datetime(df["date"], format=DATE_FORMAT, errors="coerce")
+    summary = df.drop(columns="station_id").isnull().groupby(stations).sum().add_prefix("missing_")
+    summary.insert(0, "records", stations.groupby(stations).size())
+    summary["first_date"] = dates.groupby(stations).min()
+    summary["last_date"] = dates.groupby(stations).max()
+    return summary
+
+
+def merge_summaries(left, right):
+    if left is None:
+        return right
+    counts = [col for col in left.columns if col not in ("first_date", "last_date")]
+    merged = left[counts].add(right[counts], fill_value=0).astype("int64")
+    merged["first_date"] = pd.concat([left["first_date"], right["first_date"]], axis=1).min(axis=1)
+    merged["last_date"] = pd.concat([left["last_date"], right["last_date"]], axis=1).max(axis=1)
+    return merged
+
+
+def missing_percent(summary):
+    missing = summary.filter(like="missing_")
+    return missing.div(summary["records"], axis=0).mul(100).rename(columns=lambda col: col[len("missing_"):])
+
+
+def build_report(summary, rejections=None, index=None):
+    report = summary[["records", "first_date", "last_date"]].copy()
+    report = report.join(missing_percent(summary).add_prefix("missing_pct_"))
+    if rejections is not None:
+        report = report.join(rejections.add_prefix("rejected_")).fillna({f"rejected_{col}": 0
+                                                                          for col in rejections.columns})
+    if index is not None:
+        report = report.join(index.set_index("station_id")["status"])
+    report.index.name = "station_id"
+    return report
+
+
+def parquet_summary(partition):
+    # Record and null counts come from the Parquet footers. Date coverage uses the footer min/max when 'date' is
+    # stored as a date type, otherwise only the 'date' column is read.
+    import pyarrow.parquet as pq
+    import pyarrow.types as pa_types
+
+    files = sorted(os.path.join(partition, name) for name in os.listdir(partition) if name.endswith(".parquet"))
+    records, nulls, dates = 0, {}, []
+    for file in files:
+        parquet_file = pq.ParquetFile(file)
+        metadata = parquet_file.metadata
+        records += metadata.num_rows
+        for group in range(metadata.num_row_groups):
+            row_group = metadata.row_group(group)
+            for col in range(row_group.num_columns):
+                column = row_group.column(col)
+                nulls[column.path_in_schema] = nulls.get(column.path_in_schema, 0) + column.statistics.null_count
+
+        date_type = parquet_file.schema_arrow.field("date").type
+        if pa_types.is_string(date_type) or pa_types.is_large_string(date_type):
+            column = parquet_file.read(columns=["date"]).column("date").to_pandas()
+            dates.append(pd.to_datetime(column, format=DATE_FORMAT, errors="coerce"))
+        else:
+            for group in range(metadata.num_row_groups):
+                stats = metadata.row_group(group).column(parquet_file.schema_arrow.get_field_index("date")).statistics
+                dates.append(pd.to_datetime(pd.Series([stats.min, stats.max])))
+
+    dates = pd.concat(dates) if dates else pd.Series(dtype="datetime64[ns]")
+    row = {"records": records, **{f"missing_{col}": count for col, count in nulls.items()},
+           "first_date": dates.min(), "last_date": dates.max()}
+    return pd.DataFrame([row])
+
+
+def summary_from_datasets(station_ids, directory="station_datasets"):
+    # One pass over the split station data: footers only for Parquet partitions, one read per station CSV
+    summaries = []
+    for sid in station_ids:
+        path = station_path(directory, sid)
+        if os.path.isdir(path):
+            summary = parquet_summary(path)
+            summary.index = pd.Index([sid], name="station_id")
+        elif os.path.exists(path):
+            summary = partial_summary(pd.read_csv(path))
+        else:
+            continue
+        summaries.append(summary)
+    return pd.concat(summaries) if summaries else pd.DataFrame()
+
+
+def write_report(report, path=QUALITY_FILE):
+    report.to_csv(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the station data-quality report from the split datasets.")
+    parser.add_argument("--input-dir", default="station_datasets")
+    args = parser.parse_args()
+
+    index = pd.read_csv(STATION_INDEX_FILE) if os.path.exists(STATION_INDEX_FILE) else None
+    rejections = pd.read_csv(REJECTIONS_FILE, index_col="station_id") if os.path.exists(REJECTIONS_FILE) else None
+    if index is not None:
+        station_ids = index.loc[index["status"] == "split", "station_id"]
+    else:
+        station_ids = [int(name.split("=")[1]) if "=" in name else int(name[len("station_"):-len(".csv")])
+                       for name in os.listdir(args.input_dir) if name.startswith("station")]
+
+    report = build_report(summary_from_datasets(station_ids, args.input_dir).sort_index(), rejections, index)
+    write_report(report)
+    print(f"Quality report for {len(report)} stations saved at {QUALITY_FILE}")
@@ -0,0 +1,92 @@
+import hashlib
+import os
+import shutil
+
+import pandas as pd
+
+# Reading and writing of the per-station datasets. Stations are stored either as one CSV per station
+# (station_{sid}.csv) or as a Parquet dataset partitioned by station_id (station_id={sid}/...). The station index
+# lists every station in climate_data.csv with its record count and whether it was split.
+
+STATION_INDEX_FILE = "station_index.csv"
+DATE_FORMAT = "%d-%m-%Y"
+
+
+def write_stations(df, directory, fmt="csv"):
+    # Writes every station's rows in a single pass over the frame
+    os.makedirs(directory, exist_ok=True)
+    if fmt == "parquet":
+        df.to_parquet(directory, partition_cols=["station_id"], index=False,
+                      existing_data_behavior="delete_matching")
+    else:
+        for sid, station_df in df.groupby("station_id", sort=False):
+            station_df.to_csv(os.path.join(directory, f"station_{sid}.csv"), index=False)
+
+
+def append_stations(df, directory, part, started, fmt="csv"):
+    # Appends one chunk of rows to the station partitions. Stations not yet in `started` have their output from
+    # any previous run replaced on first write.
+    os.makedirs(directory, exist_ok=True)
+    for sid, station_df in df.groupby("station_id", sort=False):
+        if sid not in started:
+            remove_station(directory, sid)
+            started.add(sid)
+        if fmt == "parquet":
+            partition = os.path.join(directory, f"station_id={sid}")
+            os.makedirs(partition, exist_ok=True)
+            station_df.drop(columns="station_id").to_parquet(os.path.join(partition, f"part-{part:06d}.parquet"),
+                                                             index=False)
+        else:
+            path = os.path.join(directory, f"station_{sid}.csv")
+            station_df.to_csv(path, mode="a", header=not os.path.exists(path), index=False)
+
+
+def remove_station(directory, sid):
+    partition = os.path.join(directory, f"station_id={sid}")
+    if os.path.isdir(partition):
+        shutil.rmtree(partition)
+    csv_path = os.path.join(directory, f"station_{sid}.csv")
+    if os.path.exists(csv_path):
+        os.remove(csv_path)
+
+
+def write_station_index(index, path=STATION_INDEX_FILE):
+    index.to_csv(path, index=False)
+
+
+def read_station_ids(path=STATION_INDEX_FILE, source="climate_data.csv"):
+    # IDs of the stations that were split, from the station index when it exists. Otherwise every station in the
+    # source data, reading only its 'station_id' column.
+    if os.path.exists(path):
+        index = pd.read_csv(path)
+        return index.loc[index["status"] == "split", "station_id"].to_numpy()
+    return pd.read_csv(source, usecols=["station_id"])["station_id"].unique()
+
+
+def station_path(directory, sid):
+    # Path of a station's partition directory if it exists, otherwise of its CSV file
+    partition = os.path.join(directory, f"station_id={sid}")
+    if os.path.isdir(partition):
+        return partition
+    return os.path.join(directory, f"station_{sid}.csv")
+
+
+def read_station(directory, sid):
+    path = station_path(directory, sid)
+    if os.path.isdir(path):
+        df = pd.read_parquet(path)
+        df["station_id"] = sid
+        return df
+    return pd.read_csv(path)
+
+
+def station_hash(directory, sid):
+    # Content hash of a station's CSV file or of every file in its partition
+    path = station_path(directory, sid)
+    files = sorted(os.path.join(path, name) for name in os.listdir(path)) if os.path.isdir(path) else [path]
+    digest = hashlib.sha256()
+    for file in files:
+        with open(file, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()
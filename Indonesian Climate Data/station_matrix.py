@@ -0,0 +1,171 @@
+import argparse
+import json
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from imputers import IMPUTE_COLUMNS
+from station_io import DATE_FORMAT, read_station, read_station_ids, station_path
+
+# Shared, memory-mapped matrix of the cleaned station data for cross-station imputation. The IMPUTE_COLUMNS of every
+# split station are written once, station after station, into one raw float64 file of shape (rows, columns); a
+# station's rows are sorted by date and occupy values[offsets[i]:offsets[i + 1]]. Worker processes map the file
+# read-only, so looking up any station's (or any neighbour's) block is a slice of the mapping: no CSV parsing and
+# no copy, and the pages are shared through the page cache however many workers read them.
+#
+#   station_matrix/values.f8     rows x len(IMPUTE_COLUMNS) float64, station-major
+#   station_matrix/index.npz     station_ids, offsets and the date of every row
+#   station_matrix/matrix.json   columns, shape and the size/mtime of every station's source, to detect changes
+
+MATRIX_DIR = "station_matrix"
+VALUES_FILE = "values.f8"
+INDEX_FILE = "index.npz"
+META_FILE = "matrix.json"
+
+
+def station_fingerprint(directory, station_ids):
+    # Size and mtime of every station's source (None for stations without data)
+    fingerprint = {}
+    for sid in station_ids:
+        path = station_path(directory, sid)
+        stat = os.stat(path) if os.path.exists(path) else None
+        fingerprint[str(sid)] = [stat.st_size, stat.st_mtime_ns] if stat else None
+    return fingerprint
+
+
+class StationMatrix:
+    """
+    Read-only, memory-mapped view of every station's IMPUTE_COLUMNS, with a station offset index.
+
+    Parameters
+    ----------
+    station_ids : np.ndarray
+        Stations in storage order.
+    offsets : np.ndarray
+        Row offsets; station i occupies rows offsets[i]:offsets[i + 1].
+    dates : np.ndarray
+        datetime64[D] date of every row (NaT where the date was missing, sorted last within the station).
+    values : np.ndarray
+        (rows, len(IMPUTE_COLUMNS)) float64 matrix, usually an np.memmap.
+    """
+
+    def __init__(self, station_ids, offsets, dates, values):
+        self.station_ids = station_ids
+        self.offsets = offsets
+        self.dates = dates
+        self.values = values
+        self.positions = pd.Index(station_ids)
+
+    @classmethod
+    def build(cls, station_ids, input_dir="station_datasets", directory=MATRIX_DIR):
+        # Streams the stations into the values file one at a time, so building needs one station in memory.
+        # Stations without data are left out.
+        os.makedirs(directory, exist_ok=True)
+        sources = station_fingerprint(input_dir, station_ids)
+        station_ids = [sid for sid in station_ids if sources[str(sid)] is not None]
+        offsets, dates = [0], []
+        with open(os.path.join(directory, VALUES_FILE), "wb") as f:
+            for sid in station_ids:
+                df = read_station(input_dir, sid)
+                station_dates = pd.to_datetime(df["date"], format=DATE_FORMAT, errors="coerce").to_numpy()
+                order = np.argsort(station_dates, kind="stable")
+                block = df[IMPUTE_COLUMNS].to_numpy(dtype="float64")[order]
+                f.write(np.ascontiguousarray(block).tobytes())
+                dates.append(station_dates[order].astype("datetime64[D]"))
+                offsets.append(offsets[-1] + len(block))
+
+        station_ids = np.asarray(station_ids, dtype="int64")
+        offsets = np.array(offsets, dtype="int64")
+        dates = np.concatenate(dates) if dates else np.array([], dtype="datetime64[D]")
+        np.savez(os.path.join(directory, INDEX_FILE), station_ids=station_ids, offsets=offsets, dates=dates)
+        with open(os.path.join(directory, META_FILE), "w") as f:
+            json.dump({"columns": IMPUTE_COLUMNS, "shape": [int(offsets[-1]), len(IMPUTE_COLUMNS)],
+                       "sources": sources}, f)
+        return cls.load(directory)
+
+    @classmethod
+    def load(cls, directory=MATRIX_DIR):
+        with open(os.path.join(directory, META_FILE)) as f:
+            meta = json.load(f)
+        with np.load(os.path.join(directory, INDEX_FILE)) as index:
+            station_ids, offsets, dates = index["station_ids"], index["offsets"], index["dates"]
+        values = (np.memmap(os.path.join(directory, VALUES_FILE), dtype="float64", mode="r",
+                            shape=tuple(meta["shape"]))
+                  if meta["shape"][0] else np.empty((0, len(IMPUTE_COLUMNS))))
+        return cls(station_ids, offsets, dates, values)
+
+    @classmethod
+    def open(cls, station_ids, input_dir="station_datasets", directory=MATRIX_DIR):
+        """Load the saved matrix, rebuilding it first if the stations or any station's source changed."""
+        meta_path = os.path.join(directory, META_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if meta["columns"] == IMPUTE_COLUMNS and meta["sources"] == station_fingerprint(input_dir, station_ids):
+                return cls.load(directory)
+        return cls.build(station_ids, input_dir, directory)
+
+    # -------------------- Lookups --------------------
+    def __contains__(self, sid):
+        return sid in self.positions
+
+    def rows(self, sid):
+        position = self.positions.get_loc(sid)
+        return slice(self.offsets[position], self.offsets[position + 1])
+
+    def station_values(self, sid):
+        # A view of the station's rows in date order (read-only when the matrix is memory-mapped)
+        return self.values[self.rows(sid)]
+
+    def station_dates(self, sid):
+        return self.dates[self.rows(sid)]
+
+    def neighbour_values(self, sid, neighbours):
+        """
+        Neighbouring stations' values on the dates of station `sid`.
+
+        Parameters
+        ----------
+        sid : int
+            Station whose dates are looked up.
+        neighbours : list of int
+            Stations to read; stations not in the matrix are skipped.
+
+        Returns
+        -------
+        np.ndarray
+            (len(found neighbours), rows of `sid`, len(IMPUTE_COLUMNS)) array in `sid`'s date order, NaN where a
+            neighbour has no record for the date.
+        """
+        dates = self.station_dates(sid)
+        aligned = []
+        for neighbour in neighbours:
+            if neighbour not in self:
+                continue
+            neighbour_dates = self.station_dates(neighbour)
+            values = np.full((len(dates), len(IMPUTE_COLUMNS)), np.nan)
+            if len(neighbour_dates):
+                # Both date columns are sorted, so each date's match is found by binary search (NaT never matches)
+                found = np.minimum(np.searchsorted(neighbour_dates, dates), len(neighbour_dates) - 1)
+                matched = neighbour_dates[found] == dates
+                values[matched] = self.station_values(neighbour)[found[matched]]
+            aligned.append(values)
+        return np.stack(aligned) if aligned else np.empty((0, len(dates), len(IMPUTE_COLUMNS)))
+
+
+@lru_cache(maxsize=None)
+def shared_matrix(directory=MATRIX_DIR):
+    # Mapped once per process and reused by every station the process imputes
+    return StationMatrix.load(directory)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the memory-mapped station matrix from the split stations.")
+    parser.add_argument("--input-dir", default="station_datasets")
+    parser.add_argument("--output-dir", default=MATRIX_DIR)
+    args = parser.parse_args()
+
+    matrix = StationMatrix.build(read_station_ids(), args.input_dir, args.output_dir)
+    print(f"{len(matrix.station_ids)} stations, {matrix.values.shape[0]:,} rows written to {args.output_dir}")
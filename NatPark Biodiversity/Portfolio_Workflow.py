@@ -1,271 +1,263 @@
-import os
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import textwrap
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Table, TableStyle
-from reportlab.lib import colors
-
-pd.set_option('display.max_columns', None)
-
-# -------------------- Config --------------------
-# Parameterize paths for portability
-DATA_DIR = "Data"
-OUTPUT_DIR = "Output"
-
-OBSERVATIONS_FILE = os.path.join(DATA_DIR, "observations.csv")
-SPECIES_FILE = os.path.join(DATA_DIR, "species_info.csv")
-
-
-# -------------------- Functions --------------------
-def endangered_barplot(data, x_axis_data, x_axis_name, filepath):
-    """
-    Create a barplot of endangered species observations by park.
-
-    Parameters
-    ----------
-    data : pd.DataFrame
-        Must contain species names, park names, and observation counts.
-    x_axis_data : str
-        Column to use for the x-axis (e.g. 'common_names' or 'scientific_name').
-    x_axis_name : str
-        Human-friendly axis label (used in the plot).
-    filepath : str
-        Output path for the saved PNG chart.
-    """
-    plt.subplots(figsize=(20, 8))
-    endangered_bar = sns.barplot(x=x_axis_data, y="observations",
-                                 data=data, hue="park_name")
-
-    # Wrap and capitalize x-axis labels for readability
-    x_wrap = [
-        textwrap.fill(
-            " ".join([label.capitalize() for label in label.get_text().split()]),
-            width=13
-        )
-        for label in endangered_bar.get_xticklabels()
-    ]
-    plt.xticks(ticks=endangered_bar.get_xticks(), labels=x_wrap)
-
-    # Gridlines and labels
-    endangered_bar.yaxis.grid(True, linestyle="--", alpha=0.6)
-    plt.xlabel(x_axis_name)
-    plt.ylabel("Observations")
-    plt.title("Total Observations of Endangered Species")
-
-    # Legend placement
-    plt.legend(title="National Park", loc="center left", bbox_to_anchor=(0.725, 1.1))
-
-    # Save figure
-    plt.savefig(filepath, bbox_inches="tight")
-    plt.clf()
-
-
-def mask_names(df, col):
-    """
-    Mask repeated values in a column for table readability.
-
-    Parameters
-    ----------
-    df : pd.DataFrame
-        DataFrame containing the column to mask.
-    col : str
-        Column name where duplicates should be masked.
-    """
-    df[col] = df[col].mask(df[col].duplicated()).fillna("")
-
-
-def build_species_pdf(col_name, data, file_path, title_text):
-    """
-    Build a styled PDF report showing species observations by park.
-
-    Parameters
-    ----------
-    col_name : str
-        Column name to use as species identifier (common or scientific).
-    data : pd.DataFrame
-        DataFrame containing [species, park_name, observations].
-    file_path : str
-        Output path for the PDF file.
-    title_text : str
-        Title to display at the top of the PDF.
-    """
-    # Prepare table data (add header row)
-    table_data = [[col_name, 'Park Name', 'Observations']] + data.values.tolist()
-
-    # Table styling
-    style_commands = [
-        ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
-        ("BACKGROUND", (0, 1), (2, 4), colors.lightyellow),
-        ("BACKGROUND", (0, 5), (2, 8), colors.lightgreen),
-        ("BACKGROUND", (0, 9), (2, 16), colors.lightpink),
-        ("BACKGROUND", (0, 17), (2, 24), colors.lightyellow),
-        ("BACKGROUND", (0, 25), (2, 28), colors.lightpink),
-        ("BACKGROUND", (0, 29), (2, 40), colors.lightblue),
-        ("BACKGROUND", (0, 41), (2, 48), colors.lightpink),
-        ("BACKGROUND", (0, 49), (2, 52), colors.lightblue),
-        ("BACKGROUND", (0, 53), (2, 56), colors.lightseagreen),
-        ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-        ("BOTTOMPADDING", (0, 0), (-1, 0), 5),
-        ("GRID", (0, 0), (-1, -1), 1, colors.black),
-    ]
-    line_break_number = list(range(5, 54, 4))
-    for line in line_break_number:
-        style_commands.append(('LINEABOVE', (0, line), (2, line), 3, colors.black))
-
-    # Styles for title and legend
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        name="TitleStyle",
-        parent=styles["Heading1"],
-        alignment=1,
-        fontSize=16,
-        leading=15,
-        spaceAfter=0
-    )
-    legend_style = ParagraphStyle(
-        name="LegendStyle",
-        parent=styles["Heading2"],
-        alignment=1,
-        fontSize=9,
-        leading=0,
-        spaceAfter=0
-    )
-    legendbody_style = ParagraphStyle(
-        name="Legendbody",
-        parent=styles["Heading3"],
-        alignment=1,
-        fontSize=8,
-        leading=-1,
-        spaceAfter=10
-    )
-
-    # Text content for PDF
-    title = Paragraph(title_text, title_style)
-    legend = Paragraph("Legend", legend_style)
-    legend_body = Paragraph(
-        "Mammal: Red____Bird: Blue____Fish: Yellow____Vascular Plant: Green____Amphibian: Turquoise",
-        legendbody_style
-    )
-
-    # Create table and apply style
-    table = Table(table_data)
-    table.setStyle(TableStyle(style_commands))
-
-    # Build PDF
-    doc = SimpleDocTemplate(file_path, topMargin=50, bottomMargin=40)
-    doc.build([title, legend, legend_body, table])
-    print(f"PDF saved at {file_path}")
-
-
-# -------------------- Workflow --------------------
-def main():
-    """Main analysis workflow: load data, process, visualize, and export reports."""
-
-    # Load data
-    dfo = pd.read_csv(OBSERVATIONS_FILE)
-    dfs = pd.read_csv(SPECIES_FILE)
-
-    # Clean common names
-    dfs["common_names"] = dfs["common_names"].apply(lambda x: str(x).split(",")[0])
-
-    # Create a quick pivot table to get a breakdown of conversation status
-    con_status_pivot = dfs.pivot_table(index="category",
-                                columns="conservation_status",
-                                aggfunc="size",
-                                fill_value=0)
-
-    con_status_pivot.columns = ["Endangered", "Threatened", "Species of Concern", "In Recovery"]
-
-    con_status_pivot.to_csv("Output/Conservation Status by Species Category.csv")
-
-
-    # Fill missing conservation_status and add 'is_protected' column for pivot table
-    dfs["conservation_status"] = dfs["conservation_status"].fillna("Not of Concern")
-    dfs["is_protected"] = dfs["conservation_status"] != "Not of Concern"
-
-
-    # Create another pivot table to get a breakdown of protection status
-    protected_count_pivot = (dfs.groupby(["category", "is_protected"])
-                       .scientific_name.nunique()
-                       .reset_index()
-                       .pivot(index="category",
-                              columns="is_protected",
-                              values="scientific_name"))
-
-    protected_count_pivot.columns = ["Not Protected", "Protected"]
-
-    # Adding a percentage for ease of analysis.
-    protected_count_pivot["Percentage Protected"] = round((protected_count_pivot["Protected"] /
-                                                     (protected_count_pivot["Protected"] + protected_count_pivot["Not Protected"]))
-                                                    * 100, 2)
-
-    protected_count_pivot.to_csv("Output/Protection Count by Species Category.csv")
-
-
-    # Filter endangered species only
-    dfs_endangered = dfs[dfs["conservation_status"] == "Endangered"]
-    dfs_endangered = dfs_endangered.merge(dfo, on="scientific_name")
-
-    # Aggregate observations
-    endangered_count = (
-        dfs_endangered.groupby(["common_names", "park_name"])
-        .agg({"observations": "sum"})
-        .reset_index())
-
-    endangered_count_sci = (
-        dfs_endangered.groupby(["scientific_name", "park_name"])
-        .agg({"observations": "sum"})
-        .reset_index())
-
-    # Order species by observations in Great Smoky Mountains NP
-    def order_smoky(df, col):
-        return (
-            df[df["park_name"] == "Great Smoky Mountains National Park"]
-            .sort_values("observations", ascending=False)[col]
-        )
-
-    order = order_smoky(endangered_count, "common_names")
-    order_sci = order_smoky(endangered_count_sci, "scientific_name")
-
-    endangered_count_sorted = endangered_count.set_index("common_names").loc[order].reset_index()
-    endangered_count_sci_sorted = endangered_count_sci.set_index("scientific_name").loc[order_sci].reset_index()
-
-    # Generate barplots
-    endangered_barplot(
-        endangered_count_sorted,
-        "common_names",
-        "Species (Common Name)",
-        os.path.join(OUTPUT_DIR, "Endangered_Barplot_Common.png"),
-    )
-    endangered_barplot(
-        endangered_count_sci_sorted,
-        "scientific_name",
-        "Species (Scientific Name)",
-        os.path.join(OUTPUT_DIR, "Endangered_Barplot.png"),
-    )
-
-    # Mask duplicates for table readability
-    mask_names(endangered_count_sorted, "common_names")
-    mask_names(endangered_count_sci_sorted, "scientific_name")
-
-    # Generate PDF reports
-    build_species_pdf(
-        "Species (Common Name)",
-        endangered_count_sorted,
-        os.path.join(OUTPUT_DIR, "Endangered_Obs_Common.pdf"),
-        "Count of Endangered Species Observations by National Park",
-    )
-    build_species_pdf(
-        "Species (Scientific Name)",
-        endangered_count_sci_sorted,
-        os.path.join(OUTPUT_DIR, "Endangered_Obs_Table.pdf"),
-        "Count of Endangered Species Observations by National Park",
-    )
-
-
-if __name__ == "__main__":
-    main()
+import argparse
+import os
+import sys
+from contextlib import contextmanager
+import pandas as pd
+
+if __name__ == "__main__":
+    # Run as a script: the repository root holds instrumentation.py (stage metrics, --metrics and --profile)
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from biodiversity_store import STORE_DIR, BiodiversityStore  # noqa: E402
+from rendering import barplot_artifact, pdf_artifact, render_artifact, render_artifacts  # noqa: E402
+from species_index import first_common_name  # noqa: E402
+
+try:
+    # Stage metrics, off unless PORTFOLIO_METRICS is set (or --metrics is given)
+    from instrumentation import PROFILERS, enable, stage  # noqa: E402
+except ImportError:
+    # A standalone copy of the project without instrumentation.py: stages run unmeasured and --metrics is refused
+    PROFILERS, enable = (), None
+
+    @contextmanager
+    def stage(name, rows_in=None, **fields):
+        yield {"rows_in": rows_in, "rows_out": None, **fields}
+
+pd.set_option('display.max_columns', None)
+
+# -------------------- Config --------------------
+# Parameterize paths for portability
+DATA_DIR = "Data"
+OUTPUT_DIR = "Output"
+
+OBSERVATIONS_FILE = os.path.join(DATA_DIR, "observations.csv")
+SPECIES_FILE = os.path.join(DATA_DIR, "species_info.csv")
+
+DEFAULT_ORDER_PARK = "Great Smoky Mountains National Park"
+STATUSES = ["Endangered", "Threatened", "Species of Concern", "In Recovery"]
+
+# Axis/column label and file name parts for each species name column
+NAME_COLUMNS = {
+    "common_names": {"label": "Species (Common Name)", "barplot": "Barplot_Common", "pdf": "Obs_Common"},
+    "scientific_name": {"label": "Species (Scientific Name)", "barplot": "Barplot", "pdf": "Obs_Table"},
+}
+
+# Each report covers the species with one conservation status, ordered by their observations in one park and
+# labelled by common or scientific name
+REPORT_SPECS = [
+    {"status": "Endangered", "order_park": DEFAULT_ORDER_PARK, "name_column": "common_names"},
+    {"status": "Endangered", "order_park": DEFAULT_ORDER_PARK, "name_column": "scientific_name"},
+]
+
+
+# -------------------- Functions --------------------
+def mask_names(df, col):
+    """
+    Mask repeated values in a column for table readability.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        DataFrame containing the column to mask.
+    col : str
+        Column name where duplicates should be masked.
+    """
+    df[col] = df[col].mask(df[col].duplicated()).fillna("")
+
+
+def species_report(store, species, sums, counts, spec):
+    """
+    Observations by species and park for one report, sliced from the species x park matrix.
+
+    Parameters
+    ----------
+    store : BiodiversityStore
+        Store the matrix was built from.
+    species : pd.DataFrame
+        The store's species table with cleaned common names (same row order).
+    sums, counts : np.ndarray
+        Matrices from BiodiversityStore.species_park_matrix.
+    spec : dict
+        'status', 'order_park' and 'name_column' of the report.
+
+    Returns
+    -------
+    pd.DataFrame
+        [name_column, park_name, observations, category], species ordered by their observations in the ordering
+        park (species not observed there are left out) and parks in name order.
+    """
+    name_column = spec["name_column"]
+    rows = store.species_rows(status=spec["status"])
+    codes = store.species["scientific_name"].cat.codes.to_numpy()[rows]
+    names = species[name_column].astype("str").to_numpy()[rows]
+
+    # Species rows sharing a name are summed together, as grouping the merged rows by name would
+    parks = store.parks.astype("str")
+    totals = pd.DataFrame(sums[codes], columns=parks).groupby(names).sum()
+    present = pd.DataFrame(counts[codes], columns=parks).groupby(names).sum() > 0
+
+    if spec["order_park"] in totals.columns:
+        ordering = totals[spec["order_park"]][present[spec["order_park"]]]
+        order = ordering.sort_values(ascending=False).index
+    else:
+        order = totals.index[:0]
+
+    report = totals.loc[order].stack()
+    report = report[present.loc[order].stack()]
+    report = report.rename_axis([name_column, "park_name"]).rename("observations").reset_index()
+
+    # Species category for the PDF colouring (the first species row's, should rows sharing a name differ)
+    categories = pd.Series(species["category"].astype("str").to_numpy()[rows], index=names)
+    report["category"] = report[name_column].map(categories.groupby(level=0).first())
+    return report
+
+
+def report_artifacts(report, spec):
+    # Barplot and PDF table for one report. The default status and park keep their original file names.
+    names = NAME_COLUMNS[spec["name_column"]]
+    prefix = spec["status"].replace(" ", "_")
+    if spec["order_park"] != DEFAULT_ORDER_PARK:
+        prefix += "_" + spec["order_park"].replace(" National Park", "").replace(" ", "_")
+
+    table = report.copy()
+    mask_names(table, spec["name_column"])
+    return [
+        barplot_artifact(
+            report[[spec["name_column"], "park_name", "observations"]],
+            spec["name_column"],
+            names["label"],
+            os.path.join(OUTPUT_DIR, f"{prefix}_{names['barplot']}.png"),
+            spec["status"],
+        ),
+        pdf_artifact(
+            names["label"],
+            table,
+            os.path.join(OUTPUT_DIR, f"{prefix}_{names['pdf']}.pdf"),
+            f"Count of {spec['status']} Species Observations by National Park",
+        ),
+    ]
+
+
+# -------------------- Workflow --------------------
+def load_store():
+    # Load the preprocessed store (rebuilt from the CSVs only when they change)
+    with stage("load_store") as record:
+        store = BiodiversityStore.open(OBSERVATIONS_FILE, SPECIES_FILE, STORE_DIR)
+        record["rows_out"] = len(store.observations)
+    return store
+
+
+def measured_render(artifact):
+    # Runs in a rendering worker: every barplot and PDF build is recorded as its own stage
+    with stage(artifact["kind"], rows_in=len(artifact["data"]), path=artifact["path"]):
+        return render_artifact(artifact)
+
+
+def main(report_specs=REPORT_SPECS, workers=None, force=False, store=None):
+    """
+    Main analysis workflow: load data, process, visualize, and export reports.
+
+    Parameters
+    ----------
+    report_specs : list of dict
+        One chart and PDF per spec, see REPORT_SPECS.
+    workers : int, optional
+        Number of processes rendering charts and PDFs.
+    force : bool
+        Re-render charts and PDFs even if their inputs are unchanged.
+    store : BiodiversityStore, optional
+        Already loaded store; loaded with load_store() when omitted.
+    """
+    if store is None:
+        store = load_store()
+    dfs = store.species.copy()
+
+    with stage("status_pivots", rows_in=len(dfs)) as record:
+        # Clean common names (keep the first, most commonly used, name)
+        dfs["common_names"] = first_common_name(dfs["common_names"])
+
+        # Create a quick pivot table to get a breakdown of conversation status
+        con_status_pivot = dfs.pivot_table(index="category",
+                                    columns="conservation_status",
+                                    aggfunc="size",
+                                    fill_value=0)
+
+        con_status_pivot.columns = ["Endangered", "Threatened", "Species of Concern", "In Recovery"]
+
+        con_status_pivot.to_csv("Output/Conservation Status by Species Category.csv")
+
+
+        # Fill missing conservation_status and add 'is_protected' column for pivot table
+        dfs["conservation_status"] = (dfs["conservation_status"].cat.add_categories("Not of Concern")
+                                      .fillna("Not of Concern"))
+        dfs["is_protected"] = dfs["conservation_status"] != "Not of Concern"
+
+
+        # Create another pivot table to get a breakdown of protection status
+        protected_count_pivot = (dfs.groupby(["category", "is_protected"], observed=True)
+                           .scientific_name.nunique()
+                           .reset_index()
+                           .pivot(index="category",
+                                  columns="is_protected",
+                                  values="scientific_name"))
+
+        protected_count_pivot.columns = ["Not Protected", "Protected"]
+
+        # Adding a percentage for ease of analysis.
+        protected_count_pivot["Percentage Protected"] = round((protected_count_pivot["Protected"] /
+                                                         (protected_count_pivot["Protected"] + protected_count_pivot["Not Protected"]))
+                                                        * 100, 2)
+
+        protected_count_pivot.to_csv("Output/Protection Count by Species Category.csv")
+        record["rows_out"] = len(con_status_pivot) + len(protected_count_pivot)
+
+
+    # Observation totals for every species in every park, aggregated once and sliced for each report
+    with stage("species_park_matrix", rows_in=len(store.observations)) as record:
+        sums, counts = store.species_park_matrix()
+        record["rows_out"] = int((counts > 0).sum())
+
+    artifacts = []
+    for spec in report_specs:
+        with stage("species_report", conservation_status=spec["status"], order_park=spec["order_park"],
+                   name_column=spec["name_column"]) as record:
+            report = species_report(store, dfs, sums, counts, spec)
+            record["rows_out"] = len(report)
+        artifacts += report_artifacts(report, spec)
+
+    # The rendering stage draws the charts and PDFs in parallel and skips unchanged ones
+    with stage("render_artifacts", rows_in=len(artifacts)) as record:
+        record["rows_out"] = len(render_artifacts(artifacts, OUTPUT_DIR, workers=workers, force=force,
+                                                  render=measured_render))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the NatPark biodiversity analysis and reports.")
+    parser.add_argument("--status", nargs="+", choices=STATUSES, default=["Endangered"],
+                        help="Conservation statuses to report on")
+    parser.add_argument("--order-park", nargs="+", default=[DEFAULT_ORDER_PARK],
+                        help="Parks whose observation counts order the species")
+    parser.add_argument("--names", nargs="+", choices=sorted(NAME_COLUMNS), default=list(NAME_COLUMNS),
+                        help="Label species by common and/or scientific name")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Processes rendering charts and PDFs")
+    parser.add_argument("--force", action="store_true", help="Re-render charts and PDFs even if they are unchanged")
+    parser.add_argument("--metrics", help="Append per-stage metrics to this JSON-lines file")
+    parser.add_argument("--profile", choices=PROFILERS, help="Also profile every stage (requires --metrics)")
+    args = parser.parse_args()
+
+    if args.metrics:
+        if enable is None:
+            parser.error("--metrics needs instrumentation.py from the repository root")
+        enable(args.metrics, args.profile)
+    elif args.profile:
+        parser.error("--profile requires --metrics")
+
+    # The parks are only known once the store is loaded; a misspelt park would otherwise render empty reports
+    store = load_store()
+    unknown = [park for park in args.order_park if park not in store.parks]
+    if unknown:
+        parser.error(f"unknown --order-park {', '.join(map(repr, unknown))} (choose from {', '.join(store.parks)})")
+
+    specs = [{"status": status, "order_park": park, "name_column": name_column}
+             for status in args.status for park in args.order_park for name_column in args.names]
+    main(specs, workers=args.workers, force=args.force, store=store)
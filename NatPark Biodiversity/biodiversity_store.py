@@ -0,0 +1,201 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# Preprocessed store of the species and observation tables. 'scientific_name', 'park_name', 'category' and
+# 'conservation_status' are held as integer-coded categoricals (both tables share the scientific_name codes), and
+# the lookups the workflow needs are prebuilt as offset indexes:
+#   species -> observation rows   observations are stored sorted by species code, so a species' rows are one slice
+#   species -> species rows       species_info.csv repeats some scientific names under different common names
+#   park -> observation rows      a permutation of the observation rows grouped by park
+#   status -> species rows        positions in the species table for each conservation status
+# The store is saved as Parquet tables plus an .npz of the indexes, and rebuilt only when the source CSVs change.
+
+STORE_DIR = os.path.join("Data", "store")
+STORE_TABLES = {"species": "species.parquet", "observations": "observations.parquet"}
+STORE_INDEXES = "indexes.npz"
+STORE_META = "store.json"
+
+SPECIES_DTYPES = {"category": "category", "scientific_name": "str", "common_names": "str",
+                  "conservation_status": "category"}
+OBSERVATION_DTYPES = {"scientific_name": "category", "park_name": "category", "observations": "int32"}
+
+
+def offsets_for(codes, n):
+    # Start offset of every code in an array sorted by code; code i occupies offsets[i]:offsets[i + 1]
+    return np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=n))]).astype("int64")
+
+
+def gather_ranges(starts, lengths):
+    # Concatenation of the ranges starts[i]:starts[i] + lengths[i], without a Python loop
+    ends = np.cumsum(lengths)
+    return np.arange(ends[-1] if len(ends) else 0) - np.repeat(ends - lengths, lengths) + np.repeat(starts, lengths)
+
+
+def source_fingerprint(paths):
+    return {path: [os.stat(path).st_size, os.stat(path).st_mtime_ns] for path in paths}
+
+
+class BiodiversityStore:
+    """
+    Species and observation tables with integer-coded keys and prebuilt lookup indexes.
+
+    Parameters
+    ----------
+    species : pd.DataFrame
+        species_info.csv with categorical 'category', 'scientific_name' and 'conservation_status'.
+    observations : pd.DataFrame
+        observations.csv sorted by species code, with 'scientific_name' sharing the species table's categories.
+    indexes : dict of np.ndarray, optional
+        Saved indexes; rebuilt from the tables when not given.
+    """
+
+    def __init__(self, species, observations, indexes=None):
+        self.species = species
+        self.observations = observations
+        self.names = species["scientific_name"].cat.categories
+        self.parks = observations["park_name"].cat.categories
+        self.statuses = species["conservation_status"].cat.categories
+        self.indexes = indexes if indexes is not None else self.build_indexes()
+
+    @classmethod
+    def from_csv(cls, observations_file, species_file):
+        species = pd.read_csv(species_file, dtype=SPECIES_DTYPES)
+        observations = pd.read_csv(observations_file, dtype=OBSERVATION_DTYPES)
+
+        # Both tables share one sorted set of scientific_name codes
+        names = pd.Index(species["scientific_name"].unique()).union(observations["scientific_name"].cat.categories)
+        species["scientific_name"] = pd.Categorical(species["scientific_name"], categories=names)
+        observations["scientific_name"] = observations["scientific_name"].cat.set_categories(names)
+
+        # Sorting by species code (stable, so each species keeps the file order) turns species -> rows into a slice
+        order = np.argsort(observations["scientific_name"].cat.codes.to_numpy(), kind="stable")
+        return cls(species, observations.iloc[order].reset_index(drop=True))
+
+    def build_indexes(self):
+        species_codes = self.species["scientific_name"].cat.codes.to_numpy()
+        park_codes = self.observations["park_name"].cat.codes.to_numpy()
+        status_codes = self.species["conservation_status"].cat.codes.to_numpy()
+
+        species_rows = np.argsort(species_codes, kind="stable")
+        park_rows = np.argsort(park_codes, kind="stable")
+        status_rows = np.argsort(status_codes, kind="stable")
+        return {
+            "observation_offsets": offsets_for(self.observations["scientific_name"].cat.codes.to_numpy(),
+                                               len(self.names)),
+            "species_rows": species_rows,
+            "species_offsets": offsets_for(species_codes, len(self.names)),
+            "park_rows": park_rows,
+            "park_offsets": offsets_for(park_codes, len(self.parks)),
+            # Species with no status (code -1) sort first and are left out of the status index
+            "status_rows": status_rows[(status_codes == -1).sum():],
+            "status_offsets": offsets_for(status_codes[status_codes >= 0], len(self.statuses)),
+        }
+
+    @classmethod
+    def load(cls, directory=STORE_DIR):
+        species = pd.read_parquet(os.path.join(directory, STORE_TABLES["species"]))
+        observations = pd.read_parquet(os.path.join(directory, STORE_TABLES["observations"]))
+        with np.load(os.path.join(directory, STORE_INDEXES)) as saved:
+            indexes = {name: saved[name] for name in saved.files}
+        return cls(species, observations, indexes)
+
+    def save(self, directory=STORE_DIR, sources=None):
+        os.makedirs(directory, exist_ok=True)
+        self.species.to_parquet(os.path.join(directory, STORE_TABLES["species"]), index=False)
+        self.observations.to_parquet(os.path.join(directory, STORE_TABLES["observations"]), index=False)
+        np.savez(os.path.join(directory, STORE_INDEXES), **self.indexes)
+        if sources is not None:
+            with open(os.path.join(directory, STORE_META), "w") as f:
+                json.dump(source_fingerprint(sources), f)
+
+    @classmethod
+    def open(cls, observations_file, species_file, directory=STORE_DIR):
+        """Load the saved store, rebuilding and saving it first if either source CSV has changed."""
+        sources = [observations_file, species_file]
+        meta_path = os.path.join(directory, STORE_META)
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                if json.load(f) == source_fingerprint(sources):
+                    return cls.load(directory)
+        store = cls.from_csv(observations_file, species_file)
+        store.save(directory, sources)
+        return store
+
+    # -------------------- Lookups --------------------
+    def species_rows(self, status=None, scientific_names=None):
+        """Positions in the species table with a conservation status and/or one of the given scientific names."""
+        rows = None
+        if status is not None:
+            code = self.statuses.get_indexer([status])[0]
+            offsets = self.indexes["status_offsets"]
+            rows = self.indexes["status_rows"][offsets[code]:offsets[code + 1]] if code >= 0 else np.array([], int)
+        if scientific_names is not None:
+            codes = self.names.get_indexer(scientific_names)
+            codes = codes[codes >= 0]
+            offsets = self.indexes["species_offsets"]
+            by_name = self.indexes["species_rows"][gather_ranges(offsets[codes], offsets[codes + 1] - offsets[codes])]
+            rows = by_name if rows is None else np.intersect1d(rows, by_name)
+        return np.sort(rows) if rows is not None else np.arange(len(self.species))
+
+    def observation_rows(self, species_codes=None, park=None):
+        """Observation rows for the given species codes and/or park, in stored order."""
+        rows = None
+        if species_codes is not None:
+            offsets = self.indexes["observation_offsets"]
+            rows = gather_ranges(offsets[species_codes], offsets[species_codes + 1] - offsets[species_codes])
+        if park is not None:
+            code = self.parks.get_indexer([park])[0]
+            offsets = self.indexes["park_offsets"]
+            in_park = self.indexes["park_rows"][offsets[code]:offsets[code + 1]] if code >= 0 else np.array([], int)
+            rows = np.sort(in_park) if rows is None else rows[np.isin(rows, in_park)]
+        return rows if rows is not None else np.arange(len(self.observations))
+
+    def species_park_matrix(self):
+        """
+        Observation totals for every scientific name in every park, from one pass over the observation rows.
+
+        Returns
+        -------
+        sums, counts : np.ndarray
+            (names x parks) arrays of summed observations and of the number of observation rows, indexed by the
+            scientific_name and park_name codes. A species row's totals are sums[scientific_name code].
+        """
+        cells = np.ravel_multi_index((self.observations["scientific_name"].cat.codes.to_numpy(),
+                                      self.observations["park_name"].cat.codes.to_numpy()),
+                                     (len(self.names), len(self.parks)))
+        size = len(self.names) * len(self.parks)
+        sums = np.bincount(cells, weights=self.observations["observations"].to_numpy(), minlength=size)
+        counts = np.bincount(cells, minlength=size)
+        shape = (len(self.names), len(self.parks))
+        return sums.astype("int64").reshape(shape), counts.reshape(shape)
+
+    def species_observations(self, status=None, park=None):
+        """
+        Observations joined to the species table, as species_info.merge(observations, on='scientific_name') would
+        give, restricted to species with `status` and observations in `park`.
+
+        Returns
+        -------
+        pd.DataFrame
+            One row per (species row, observation row) pair with every species column plus 'park_name' and
+            'observations'.
+        """
+        species_rows = self.species_rows(status=status)
+        species_codes = self.species["scientific_name"].cat.codes.to_numpy()[species_rows]
+        offsets = self.indexes["observation_offsets"]
+        lengths = offsets[species_codes + 1] - offsets[species_codes]
+        observation_rows = gather_ranges(offsets[species_codes], lengths)
+        species_rows = np.repeat(species_rows, lengths)
+
+        if park is not None:
+            in_park = np.isin(observation_rows, self.observation_rows(park=park))
+            species_rows, observation_rows = species_rows[in_park], observation_rows[in_park]
+
+        joined = self.species.iloc[species_rows].reset_index(drop=True)
+        observed = self.observations.iloc[observation_rows].reset_index(drop=True)
+        joined["park_name"] = observed["park_name"]
+        joined["observations"] = observed["observations"]
+        return joined
@@ -0,0 +1,342 @@
+import hashlib
+import json
+import os
+import textwrap
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import matplotlib
+matplotlib.use("Agg")  # Non-interactive backend: charts are only written to files, also from worker processes
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import seaborn as sns
+from reportlab.lib import colors
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.platypus import LongTable, SimpleDocTemplate, Paragraph, TableStyle
+
+# Rendering stage of the NatPark workflow. Every chart and PDF is described as an artifact (kind, output path, input
+# table and parameters). Artifacts are rendered in parallel worker processes, and a manifest in the output directory
+# records a hash of each artifact's table, parameters and the renderer code, so artifacts whose inputs have not changed
+# are skipped.
+
+MANIFEST_FILE = "render_manifest.json"
+
+# Row colour and its legend name for each species category
+CATEGORY_COLOURS = {
+    "Mammal": (colors.lightpink, "Red"),
+    "Bird": (colors.lightblue, "Blue"),
+    "Fish": (colors.lightyellow, "Yellow"),
+    "Vascular Plant": (colors.lightgreen, "Green"),
+    "Amphibian": (colors.lightseagreen, "Turquoise"),
+    "Reptile": (colors.lavender, "Lavender"),
+    "Nonvascular Plant": (colors.wheat, "Tan"),
+}
+
+# Rows per LongTable chunk of a PDF table
+ROWS_PER_TABLE = 1000
+
+
+# -------------------- Renderers --------------------
+def endangered_barplot(data, x_axis_data, x_axis_name, filepath, status="Endangered"):
+    """
+    Create a barplot of endangered (or other conservation status) species observations by park.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        Must contain species names, park names, and observation counts.
+    x_axis_data : str
+        Column to use for the x-axis (e.g. 'common_names' or 'scientific_name').
+    x_axis_name : str
+        Human-friendly axis label (used in the plot).
+    filepath : str
+        Output path for the saved PNG chart.
+    status : str
+        Conservation status of the species, used in the title.
+    """
+    fig, _ = plt.subplots(figsize=(20, 8))
+    endangered_bar = sns.barplot(x=x_axis_data, y="observations",
+                                 data=data, hue="park_name")
+
+    # Wrap and capitalize x-axis labels for readability
+    x_wrap = [
+        textwrap.fill(
+            " ".join([label.capitalize() for label in label.get_text().split()]),
+            width=13
+        )
+        for label in endangered_bar.get_xticklabels()
+    ]
+    plt.xticks(ticks=endangered_bar.get_xticks(), labels=x_wrap)
+
+    # Gridlines and labels
+    endangered_bar.yaxis.grid(True, linestyle="--", alpha=0.6)
+    plt.xlabel(x_axis_name)
+    plt.ylabel("Observations")
+    plt.title(f"Total Observations of {status} Species")
+
+    # Legend placement
+    plt.legend(title="National Park", loc="center left", bbox_to_anchor=(0.725, 1.1))
+
+    # Save figure, and close it so long-lived workers don't accumulate figures
+    plt.savefig(filepath, bbox_inches="tight")
+    plt.close(fig)
+
+
+@lru_cache(maxsize=None)
+def pdf_styles():
+    # The sample stylesheet and paragraph styles are built once per process and shared by every PDF
+    styles = getSampleStyleSheet()
+    return {
+        "title": ParagraphStyle(
+            name="TitleStyle",
+            parent=styles["Heading1"],
+            alignment=1,
+            fontSize=16,
+            leading=15,
+            spaceAfter=0
+        ),
+        "legend": ParagraphStyle(
+            name="LegendStyle",
+            parent=styles["Heading2"],
+            alignment=1,
+            fontSize=9,
+            leading=0,
+            spaceAfter=0
+        ),
+        "legend_body": ParagraphStyle(
+            name="Legendbody",
+            parent=styles["Heading3"],
+            alignment=1,
+            fontSize=8,
+            leading=-1,
+            spaceAfter=10
+        ),
+    }
+
+
+def category_colours(categories):
+    # Background colour of every row from its category
+    return [CATEGORY_COLOURS.get(category, (colors.white, None))[0] for category in categories]
+
+
+def category_legend(categories):
+    # Legend text for the categories present, in CATEGORY_COLOURS order
+    present = set(categories)
+    return "____".join(f"{category}: {CATEGORY_COLOURS[category][1]}" for category in CATEGORY_COLOURS
+                       if category in present)
+
+
+def table_style(species, row_colours):
+    """
+    Style commands for one table chunk, generated from its rows.
+
+    Parameters
+    ----------
+    species : np.ndarray
+        Species column of the chunk's rows (repeated names may be masked as '').
+    row_colours : list of reportlab.lib.colors.Color
+        Background colour of each row.
+
+    Returns
+    -------
+    list of tuple
+        Commands for TableStyle; table row 0 is the header, so row i of the chunk is table row i + 1.
+    """
+    style_commands = [
+        ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("BOTTOMPADDING", (0, 0), (-1, 0), 5),
+        ("GRID", (0, 0), (-1, -1), 1, colors.black),
+    ]
+
+    # One background band per run of rows with the same colour
+    run_start = 0
+    for row in range(1, len(row_colours) + 1):
+        if row == len(row_colours) or row_colours[row] != row_colours[run_start]:
+            style_commands.append(("BACKGROUND", (0, run_start + 1), (2, row), row_colours[run_start]))
+            run_start = row
+
+    # A thick line above each species group: a group starts at a non-empty name that differs from the row above
+    starts = (species[1:] != "") & (species[1:] != species[:-1])
+    for row in np.flatnonzero(starts) + 1:
+        style_commands.append(("LINEABOVE", (0, row + 1), (2, row + 1), 3, colors.black))
+    return style_commands
+
+
+def column_widths(header, table):
+    # Widths fitting the longest text of each column (header included), so every chunk of a long table lines up.
+    # Only the longest cell of each column is measured.
+    widths = []
+    for name, column in zip(header, table.columns):
+        lengths = table[column].astype("str").str.len()
+        longest = name if table.empty or len(name) >= lengths.max() else str(table[column].iloc[lengths.argmax()])
+        widths.append(stringWidth(longest, "Helvetica-Bold", 10) + 12)
+    return widths
+
+
+def table_chunks(header, data, widths):
+    # LongTables of ROWS_PER_TABLE rows, created one at a time as the document asks for them
+    table_columns = data.columns[:3]
+    for start in range(0, max(len(data), 1), ROWS_PER_TABLE):
+        rows = data.iloc[start:start + ROWS_PER_TABLE]
+        table = LongTable([header] + rows[table_columns].values.tolist(), colWidths=widths, repeatRows=1)
+        species = rows[table_columns[0]].astype("str").to_numpy()
+        table.setStyle(TableStyle(table_style(species, category_colours(rows["category"]))))
+        yield table
+
+
+class ChunkedDocTemplate(SimpleDocTemplate):
+    """
+    SimpleDocTemplate that takes the story's trailing flowables from an iterator, pulling the next one only once
+    everything before it has been laid out, so a long table is never held in memory as a whole.
+    """
+
+    def __init__(self, filename, chunks, **kwargs):
+        super().__init__(filename, **kwargs)
+        self.chunks = chunks
+        self.story = []
+
+    def build(self, story, **kwargs):
+        self.story = story
+        self.pull_chunk()
+        super().build(self.story, **kwargs)
+
+    def pull_chunk(self):
+        chunk = next(self.chunks, None)
+        if chunk is not None:
+            self.story.append(chunk)
+
+    def afterFlowable(self, flowable):
+        # Called after every flowable is drawn; build() stops as soon as the story list is empty
+        if not self.story:
+            self.pull_chunk()
+
+
+def build_species_pdf(col_name, data, file_path, title_text):
+    """
+    Build a styled PDF report showing species observations by park.
+
+    Rows are coloured by species category and a line separates each species' group of rows. Long tables are laid
+    out as a series of LongTables of ROWS_PER_TABLE rows, each with the header row repeated on every page; the
+    chunks are created one at a time while the document is built, so memory does not grow with the table.
+
+    Parameters
+    ----------
+    col_name : str
+        Column name to use as species identifier (common or scientific).
+    data : pd.DataFrame
+        DataFrame containing [species, park_name, observations, category].
+    file_path : str
+        Output path for the PDF file.
+    title_text : str
+        Title to display at the top of the PDF.
+    """
+    header = [col_name, 'Park Name', 'Observations']
+
+    # Text content for PDF
+    styles = pdf_styles()
+    story = [
+        Paragraph(title_text, styles["title"]),
+        Paragraph("Legend", styles["legend"]),
+        Paragraph(category_legend(data["category"]), styles["legend_body"]),
+    ]
+
+    # A single chunk keeps ReportLab's automatic column widths
+    widths = column_widths(header, data[data.columns[:3]]) if len(data) > ROWS_PER_TABLE else None
+
+    # Build PDF
+    doc = ChunkedDocTemplate(file_path, table_chunks(header, data, widths), topMargin=50, bottomMargin=40)
+    doc.build(story)
+    print(f"PDF saved at {file_path}")
+
+
+# -------------------- Rendering stage --------------------
+def barplot_artifact(data, x_axis_data, x_axis_name, filepath, status="Endangered"):
+    return {"kind": "barplot", "path": filepath, "data": data,
+            "params": {"x_axis_data": x_axis_data, "x_axis_name": x_axis_name, "status": status}}
+
+
+def pdf_artifact(col_name, data, file_path, title_text):
+    return {"kind": "pdf", "path": file_path, "data": data, "params": {"col_name": col_name, "title_text": title_text}}
+
+
+@lru_cache(maxsize=None)
+def renderer_hash():
+    # Hash of this module's source, like the pipeline hashes a stage's code: a change to any renderer (layout,
+    # styles, colours) re-renders every artifact instead of keeping outputs made by the old code
+    with open(os.path.abspath(__file__), "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def artifact_hash(artifact):
+    # Hash of everything that determines the output: renderer code, kind, parameters, column names and table values
+    digest = hashlib.sha256()
+    digest.update(renderer_hash().encode())
+    digest.update(json.dumps({"kind": artifact["kind"], "params": artifact["params"],
+                              "columns": list(map(str, artifact["data"].columns))}, sort_keys=True).encode())
+    digest.update(pd.util.hash_pandas_object(artifact["data"], index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def render_artifact(artifact):
+    params = artifact["params"]
+    if artifact["kind"] == "barplot":
+        endangered_barplot(artifact["data"], params["x_axis_data"], params["x_axis_name"], artifact["path"],
+                           params["status"])
+    elif artifact["kind"] == "pdf":
+        build_species_pdf(params["col_name"], artifact["data"], artifact["path"], params["title_text"])
+    else:
+        raise ValueError(f"Unknown artifact kind {artifact['kind']!r}")
+    return artifact["path"]
+
+
+def render_artifacts(artifacts, output_dir, workers=None, force=False, render=render_artifact):
+    """
+    Render charts and PDFs in parallel, skipping those whose inputs are unchanged since the last run.
+
+    Parameters
+    ----------
+    artifacts : list of dict
+        Artifacts from barplot_artifact / pdf_artifact.
+    output_dir : str
+        Directory holding the render manifest.
+    workers : int, optional
+        Number of worker processes (default: one per core).
+    force : bool
+        Render every artifact even if it is unchanged.
+    render : callable
+        Renders one artifact in a worker process and returns its path (default: render_artifact). The workflow
+        passes a wrapper that records each render as a stage; it must be picklable, i.e. a module-level function.
+
+    Returns
+    -------
+    list of str
+        Paths of the artifacts that were rendered.
+    """
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+    hashes = {artifact["path"]: artifact_hash(artifact) for artifact in artifacts}
+    pending = [artifact for artifact in artifacts
+               if force or manifest.get(artifact["path"]) != hashes[artifact["path"]]
+               or not os.path.exists(artifact["path"])]
+    print(f"Rendering {len(pending)} of {len(artifacts)} charts and reports")
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=min(workers or os.cpu_count(), len(pending))) as executor:
+            rendered = list(executor.map(render, pending))
+    else:
+        rendered = []
+
+    for path in rendered:
+        manifest[path] = hashes[path]
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=1)
+    return rendered
@@ -0,0 +1,140 @@
+import argparse
+import re
+import string
+
+import numpy as np
+import pandas as pd
+
+from biodiversity_store import gather_ranges, offsets_for
+
+# Text index over the species catalog, built once from species_info.csv. Every species row's common and scientific
+# names are tokenized with vectorized string operations into an inverted index (token -> species rows), and the
+# number of species whose common names use each word is precomputed per conservation status. Name lookups are then
+# binary searches over the sorted tokens, and the "which words dominate protected species" analysis is a column of
+# that table instead of a list.count loop.
+
+NOT_OF_CONCERN = "Not of Concern"
+PUNCTUATION = re.compile(f"[{re.escape(string.punctuation)}]")
+
+
+def first_common_name(common_names):
+    # The most commonly used name is the first in the comma separated list: drop everything from the first comma
+    return common_names.astype("str").str.replace(r",.*", "", regex=True)
+
+
+def tokenize(names):
+    """
+    Lower-case words of each name, punctuation removed (so "Gapper's" becomes "gappers").
+
+    Parameters
+    ----------
+    names : pd.Series
+        One name (or comma separated list of names) per species row.
+
+    Returns
+    -------
+    pd.Series
+        One word per line, indexed by the position of its row in `names`.
+    """
+    names = names.reset_index(drop=True).astype("str")
+    return names.str.replace(PUNCTUATION, "", regex=True).str.lower().str.split().explode().dropna()
+
+
+def unique_pairs(codes, rows, n_rows):
+    # Distinct (code, row) pairs, sorted by code and then row
+    pairs = np.sort(codes.astype("int64") * n_rows + rows)
+    pairs = pairs[np.concatenate([[True], pairs[1:] != pairs[:-1]])] if len(pairs) else pairs
+    return pairs // n_rows, pairs % n_rows
+
+
+class SpeciesTextIndex:
+    """
+    Inverted index of species names with per-status word counts.
+
+    Parameters
+    ----------
+    species : pd.DataFrame
+        species_info.csv (or the BiodiversityStore species table) with 'scientific_name', 'common_names' and
+        'conservation_status'. Search results are positions in this table.
+    """
+
+    def __init__(self, species):
+        self.species = species.reset_index(drop=True)
+        n_rows = len(self.species)
+        common = tokenize(self.species["common_names"])
+        scientific = tokenize(self.species["scientific_name"])
+        words = pd.concat([common, scientific])
+
+        # Tokens are interned once; deduplication and counting then work on integer codes
+        codes, self.tokens = pd.factorize(words.to_numpy(), sort=True)
+        rows = words.index.to_numpy()
+
+        # Sorted token list; token i's species rows are rows[offsets[i]:offsets[i + 1]], in ascending row order
+        token_codes, self.rows = unique_pairs(codes, rows, n_rows)
+        self.offsets = offsets_for(token_codes, len(self.tokens))
+
+        # Number of species per conservation status whose common names contain each word
+        status_codes, statuses = pd.factorize(self.species["conservation_status"].astype("object")
+                                              .fillna(NOT_OF_CONCERN).to_numpy(), sort=True)
+        common_codes, common_rows = unique_pairs(codes[:len(common)], rows[:len(common)], n_rows)
+        counts = np.bincount(common_codes * len(statuses) + status_codes[common_rows],
+                             minlength=len(self.tokens) * len(statuses)).reshape(len(self.tokens), len(statuses))
+        used = counts.any(axis=1)
+        self.word_counts = pd.DataFrame(counts[used], index=pd.Index(self.tokens[used], name="word"),
+                                        columns=pd.Index(statuses, name="conservation_status"))
+
+    def token_rows(self, term, prefix=True):
+        # Species rows with a token equal to `term`, or starting with it when `prefix` is set
+        term = term.lower()
+        start = self.tokens.searchsorted(term)
+        if prefix:
+            end = self.tokens.searchsorted(term + "\uffff")
+        else:
+            end = start + int(start < len(self.tokens) and self.tokens[start] == term)
+        starts = self.offsets[start:end]
+        return np.unique(self.rows[gather_ranges(starts, self.offsets[start + 1:end + 1] - starts)])
+
+    def search(self, query, prefix=True):
+        """
+        Species rows whose common or scientific names contain every word of `query`.
+
+        Parameters
+        ----------
+        query : str
+            Words to look up, matched case-insensitively with punctuation removed.
+        prefix : bool
+            Match words starting with each query word (e.g. 'bat' finds 'Bats' and 'Batrachoseps').
+
+        Returns
+        -------
+        pd.DataFrame
+            The matching rows of the species table.
+        """
+        terms = PUNCTUATION.sub("", query).lower().split()
+        if not terms:
+            return self.species.iloc[:0]
+        rows = self.token_rows(terms[0], prefix)
+        for term in terms[1:]:
+            rows = np.intersect1d(rows, self.token_rows(term, prefix), assume_unique=True)
+        return self.species.iloc[rows]
+
+    def top_words(self, status=None, n=10):
+        # Words used by the most species names with the given conservation status (all species when None)
+        counts = self.word_counts.sum(axis=1) if status is None else self.word_counts[status]
+        return counts.sort_values(ascending=False, kind="stable").head(n).rename("count")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search species names and count the words used by status.")
+    parser.add_argument("--species-file", default="Data/species_info.csv")
+    parser.add_argument("--search", help="Words to look up in common and scientific names")
+    parser.add_argument("--exact", action="store_true", help="Match whole words instead of prefixes")
+    parser.add_argument("--status", default="Species of Concern", help="Conservation status for the word counts")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    index = SpeciesTextIndex(pd.read_csv(args.species_file))
+    if args.search:
+        print(index.search(args.search, prefix=not args.exact).to_string())
+    else:
+        print(index.top_words(args.status, args.top))
@@ -1,127 +1,512 @@
-import pandas as pd
-import plotly.graph_objects as go
-import matplotlib.pyplot as plt
-import numpy as np
-import seaborn as sns
-import statsmodels
-
-
-
-class SalesReport:
-    def __init__(self, input_path="Portfolio/Data/sales_data.csv", output_path="Portfolio/Data/trimmed_data.csv"):
-        self.input = input_path
-        self.output = output_path
-        self.clean_data = None
-        self.data = None
-        self.report_dates = "Portfolio/Reports/Top_Dates_Report.csv"
-        self.report_order_status = "Portfolio/Reports/Order_Status_Report.csv"
-        self.report_sales_region = "Portfolio/Reports/Regional_Sales_Report.csv"
-        self.report_us_states = "Portfolio/Reports/US_States_Report.csv"
-        self.report_chart = "Portfolio/Reports/Chart_Report.html"
-
-    def load_data(self):
-        try:
-            self.data = pd.read_csv(self.input, encoding='ISO-8859-1')
-        except FileNotFoundError:
-            print("The file inventory.csv was not found.")
-        except pd.errors.EmptyDataError:
-            print("The file is empty.")
-
-    def process_data(self):
-        df = self.data
-        columns_to_drop = ['phone', 'address_line_1', 'address_line_2', 'contact_first_name', 'contact_last_name',
-                           'online_order_number', 'postal_code']
-        df_drop = df.drop(columns=[col for col in columns_to_drop if col in df.columns])
-
-        df_drop['territory'] = df_drop['territory'].replace('Japan', 'APAC')
-        df_drop['territory'] = df_drop['territory'].fillna('North America')
-        df_drop['order_date'] = pd.to_datetime(df_drop['order_date']).dt.date
-        df_drop['total_sales'] = df_drop['quantity_ordered'] * df_drop['price_each']
-        df_drop.rename(columns={'territory': 'region'}, inplace=True)
-
-        self.clean_data = df_drop
-        df_drop.to_csv(self.output, index=False)
-        return self.clean_data
-
-    def create_report(self):
-        clean_data = self.clean_data
-
-        report_top_dates = (
-            clean_data
-            .groupby('order_date')
-            .agg(total_sales=('total_sales', 'sum'), order_count=('order_id', 'count'))
-            .sort_values(by='total_sales', ascending=False)
-            .assign(total_sales=lambda df: df['total_sales'].apply(lambda s: f'${s:,.2f}'))
-            .rename(columns={'total_sales': 'Total Sales', 'order_count': 'Order Count'})
-        ).head(10)
-
-        report_order_status = (
-            clean_data
-            .groupby('status')
-            .agg(order_count=('order_id', 'count'))
-            .rename(columns={
-                'order_count': 'Order Count'})
-        )
-
-        region_sales = clean_data.groupby(['region', 'country']).agg(
-            total_sales=('total_sales', 'sum'),
-            order_count=('order_id', 'count'))
-        region_totals = region_sales.groupby(level='region').sum()
-
-        region_totals['country'] = 'REGIONAL TOTAL'
-        region_totals = region_totals.set_index('country', append=True)
-
-        report_sales_region = ((pd.concat([region_sales, region_totals])
-                                .sort_values(by=['region', 'total_sales'], ascending=[True, False]))
-                               .assign(total_sales=lambda df: df['total_sales'].apply(lambda s: f'${s:,.2f}'))
-                               .rename(columns={'total_sales': 'Total Sales', 'order_count': 'Order Count'})
-                               )
-
-        report_top_states = (
-            clean_data[clean_data.country == 'USA']
-            .groupby('state')
-            .agg(total_sales=('total_sales', 'sum'), order_count=('order_id', 'count'))
-            .sort_values(by='total_sales', ascending=False)
-            .assign(total_sales=lambda df: df['total_sales'].apply(lambda s: f'${s:,.2f}'))
-            .rename(columns={'total_sales': 'Total Sales', 'order_count': 'Order Count'})
-        )
-
-        report_top_dates.to_csv(self.report_dates, index=True)
-        report_order_status.to_csv(self.report_order_status, index=True)
-        report_sales_region.to_csv(self.report_sales_region, index=True)
-        report_top_states.to_csv(self.report_us_states, index=True)
-
-    def create_chart(self):
-        df = self.clean_data
-
-        sales_by_product = df.groupby('product_line')['total_sales'].sum().reset_index()
-        order_count = df.groupby('product_line')['order_id'].count().reset_index()
-        x_labels = [label.replace(' ', '<br>') for label in sales_by_product['product_line']]
-
-        chart = go.Figure()
-        chart.add_trace(go.Bar(
-            x=x_labels,
-            y=sales_by_product['total_sales'], customdata=order_count['order_id'],
-            marker_color='rgb(55, 83, 109)',
-            text=sales_by_product['total_sales'],
-            textposition='auto'
-        ))
-
-        chart.update_layout(xaxis_title="Product Line",
-                            yaxis_title="Total Sales (US$)",
-                            title=dict(text="Sales Report",
-                                       subtitle=dict(
-                                           text="Total Sales by Product Line",
-                                           font=dict(color="gray", size=13))),
-                            barmode="stack",
-                            legend_traceorder='normal',
-                            )
-        chart.update_traces(texttemplate='$%{text:,.2f}<br>Order Count:<br>%{customdata}', textposition='outside')
-
-        chart.write_html(self.report_chart)
-
-    def run(self):
-        self.load_data()
-        self.process_data()
-        self.create_report()
-        self.create_chart()
+import hashlib
+import inspect
+import json
+import os
+from contextlib import contextmanager
+import pandas as pd
+import numpy as np
+
+try:
+    # Stage metrics from the repository root's instrumentation.py, off unless PORTFOLIO_METRICS is set
+    from instrumentation import stage
+except ImportError:
+    # Without it on the path (e.g. this folder copied on its own) the stages simply aren't measured
+    @contextmanager
+    def stage(name, rows_in=None, **fields):
+        yield {'rows_in': rows_in, 'rows_out': None, **fields}
+
+# plotly is only needed by create_chart and is imported there, so report-only jobs don't pay for it at startup.
+
+
+# Non-date keys the reports group by; aggregate_sales builds one cell per observed combination of these
+CELL_KEYS = ['status', 'region', 'country', 'state', 'product_line']
+
+CATEGORICAL_COLUMNS = ['status', 'region', 'country', 'product_line', 'deal_size']
+
+COLUMNS_TO_DROP = ['phone', 'address_line_1', 'address_line_2', 'contact_first_name', 'contact_last_name',
+                   'online_order_number', 'postal_code']
+
+# Ingestion schema for the sales export. Dropped columns are never read, low-cardinality strings are read as
+# categoricals and small integers use narrow types. The integer types are the nullable ones, so a blank cell is read
+# as missing (as the untyped read did) instead of failing the whole file. territory stays a plain string because
+# clean_sales fills its missing values with a new label.
+SALES_DTYPES = {
+    'order_id': 'Int64',
+    'quantity_ordered': 'Int16',
+    'price_each': 'float64',
+    'sales': 'float64',
+    'status': 'category',
+    'qtr_id': 'Int8',
+    'month_id': 'Int8',
+    'year_id': 'Int16',
+    'product_line': 'category',
+    'MSPR': 'Int16',
+    'state': 'category',
+    'country': 'category',
+    'deal_size': 'category',
+}
+ORDER_DATE_FORMAT = '%m/%d/%Y %H:%M'
+
+
+def read_sales(path, chunksize=None):
+    return pd.read_csv(path, encoding='ISO-8859-1', usecols=lambda col: col not in COLUMNS_TO_DROP,
+                       dtype=SALES_DTYPES, chunksize=chunksize)
+
+
+def clean_sales(df):
+    # Cleaning shared by the in-memory and streaming paths: drop contact columns, remap territory to region
+    # and compute total_sales.
+    df_drop = df.drop(columns=[col for col in COLUMNS_TO_DROP if col in df.columns])
+
+    df_drop['territory'] = df_drop['territory'].replace('Japan', 'APAC')
+    df_drop['territory'] = df_drop['territory'].fillna('North America')
+    df_drop['order_date'] = pd.to_datetime(df_drop['order_date'], format=ORDER_DATE_FORMAT)
+    df_drop['total_sales'] = df_drop['quantity_ordered'] * df_drop['price_each']
+    df_drop.rename(columns={'territory': 'region'}, inplace=True)
+    return df_drop
+
+
+def clean_schema():
+    # Identifies how the clean table is made (ingestion schema and cleaning code). It is stored with the Parquet
+    # cache, so changing either one invalidates tables cleaned the old way.
+    digest = hashlib.sha256(json.dumps([SALES_DTYPES, COLUMNS_TO_DROP, CATEGORICAL_COLUMNS, ORDER_DATE_FORMAT],
+                                       sort_keys=True).encode())
+    for function in (read_sales, clean_sales):
+        digest.update(inspect.getsource(function).encode())
+    return digest.hexdigest()
+
+
+def file_fingerprint(path, with_hash=True):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    fingerprint = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    if with_hash:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        fingerprint['sha256'] = digest.hexdigest()
+    return fingerprint
+
+
+def factorize_sorted(values):
+    # Integer codes for a key column, remapped so they follow sorted key order. Categorical columns (e.g. from
+    # the Parquet cache) reuse their existing codes; other columns are factorized unsorted, since sorting the
+    # few uniques is much cheaper than letting factorize sort the whole column.
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes, uniques = values.cat.codes.to_numpy(), values.cat.categories
+    else:
+        codes, uniques = pd.factorize(values)
+    order = np.argsort(np.asarray(uniques), kind='stable')
+    if np.array_equal(order, np.arange(len(order))):
+        return codes, uniques
+    rank = np.full(len(order) + 1, -1, dtype=np.int64)
+    rank[order] = np.arange(len(order))
+    return rank[codes], uniques.take(order)
+
+
+def sums_and_counts(codes, groups, sales, has_order):
+    total_sales = np.bincount(codes, weights=sales, minlength=groups)
+    rows = np.bincount(codes, minlength=groups)
+    order_count = rows if has_order.all() else np.bincount(codes[has_order], minlength=groups)
+    return total_sales, order_count, rows
+
+
+def aggregate_sales(clean_data):
+    # Partial sums and counts behind every report and the chart, built in a single scan. Every row is mapped
+    # to one cell code over all non-date keys (status x region x country x state x product_line) and one date
+    # code, and both are summed with bincount. The per-report summaries are then reduced from the small cell
+    # table instead of re-grouping the rows. These are additive, so aggregates of separate chunks or files can
+    # be combined with merge_aggregates.
+    sales = clean_data['total_sales'].to_numpy(dtype='float64', na_value=np.nan)
+    sales = np.where(np.isnan(sales), 0.0, sales)
+    has_order = clean_data['order_id'].notna().to_numpy()
+
+    # Missing keys get their own trailing code so those rows still count towards the other summaries
+    key_codes, levels = [], []
+    for key in CELL_KEYS:
+        codes, uniques = factorize_sorted(clean_data[key])
+        missing = codes < 0
+        key_codes.append(np.where(missing, len(uniques), codes) if missing.any() else codes)
+        levels.append(uniques)
+    shape = [len(level) + 1 for level in levels]
+    cells = np.ravel_multi_index(key_codes, shape) if len(clean_data) else np.zeros(0, dtype=np.int64)
+
+    n_cells = int(np.prod(shape))
+    if n_cells > max(len(clean_data), 1 << 16):
+        # Too many possible combinations to allocate dense bins for, so only observed cells get a slot
+        cell_ids, cells = np.unique(cells, return_inverse=True)
+        n_cells = len(cell_ids)
+    else:
+        cell_ids = np.arange(n_cells)
+    cell_sales, cell_orders, cell_rows = sums_and_counts(cells, n_cells, sales, has_order)
+
+    observed = np.flatnonzero(cell_rows)
+    cell_keys = dict(zip(CELL_KEYS, np.unravel_index(cell_ids[observed], shape)))
+    cell_sales, cell_orders = cell_sales[observed], cell_orders[observed]
+    level_of = dict(zip(CELL_KEYS, levels))
+
+    def summarize(keys, cell_mask=None):
+        # Groups observed cells by `keys`, skipping cells where any of those keys is missing (as groupby does)
+        valid = np.ones(len(observed), dtype=bool) if cell_mask is None else cell_mask.copy()
+        for key in keys:
+            valid &= cell_keys[key] < len(level_of[key])
+        group_ids = np.ravel_multi_index([cell_keys[key][valid] for key in keys],
+                                         [len(level_of[key]) for key in keys])
+        present, group_codes = np.unique(group_ids, return_inverse=True)
+        total_sales = np.bincount(group_codes, weights=cell_sales[valid], minlength=len(present))
+        order_count = np.bincount(group_codes, weights=cell_orders[valid], minlength=len(present))
+
+        positions = np.unravel_index(present, [len(level_of[key]) for key in keys])
+        if len(keys) == 1:
+            index = pd.Index(level_of[keys[0]].take(positions[0]), name=keys[0])
+        else:
+            index = pd.MultiIndex.from_arrays([level_of[key].take(pos) for key, pos in zip(keys, positions)],
+                                              names=keys)
+        return pd.DataFrame({'total_sales': total_sales, 'order_count': order_count.astype('int64')}, index=index)
+
+    usa = np.asarray(level_of['country'] == 'USA')
+    is_usa = np.append(usa, False)[cell_keys['country']]
+
+    date_codes, dates = factorize_sorted(clean_data['order_date'])
+    has_date = date_codes >= 0
+    date_sales, date_orders, date_rows = sums_and_counts(date_codes[has_date], len(dates), sales[has_date],
+                                                         has_order[has_date])
+    date_present = np.flatnonzero(date_rows)
+
+    return {
+        'order_date': pd.DataFrame({'total_sales': date_sales[date_present],
+                                    'order_count': date_orders[date_present].astype('int64')},
+                                   index=pd.Index(dates.take(date_present), name='order_date')),
+        'status': summarize(['status']),
+        'region': summarize(['region', 'country']),
+        'state': summarize(['state'], is_usa),
+        'product_line': summarize(['product_line']),
+    }
+
+
+def unseen_orders(clean_data, watermark, watermark_orders):
+    # Rows not covered by an order_date watermark: dated after it, or on it with an order_id not seen yet.
+    # Orders dated before the watermark are treated as already counted.
+    if watermark is None:
+        return clean_data
+    is_new = ((clean_data['order_date'] > watermark) |
+              ((clean_data['order_date'] == watermark) & ~clean_data['order_id'].isin(watermark_orders)))
+    return clean_data[is_new]
+
+
+def advance_watermark(clean_data, watermark, watermark_orders):
+    # Moves the watermark to the latest order_date in clean_data, keeping the order_ids seen on that date
+    if clean_data.empty:
+        return watermark, watermark_orders
+    latest = clean_data['order_date'].max()
+    if watermark is None or latest > watermark:
+        watermark, watermark_orders = latest, set()
+    return watermark, watermark_orders | set(clean_data.loc[clean_data['order_date'] == watermark, 'order_id'])
+
+
+def merge_aggregates(left, right):
+    if left is None:
+        return right
+    merged = {}
+    for name, table in left.items():
+        combined = table.add(right[name], fill_value=0).sort_index()
+        merged[name] = combined.astype({'order_count': 'int64'})
+    return merged
+
+
+def format_currency(values):
+    # Report columns are at most a few hundred rows, so formatting each value with str.format is plenty fast
+    return values.map('${:,.2f}'.format)
+
+
+def top_dates_report(aggregates):
+    return (
+        aggregates['order_date']
+        .sort_values(by='total_sales', ascending=False)
+        .assign(total_sales=lambda df: format_currency(df['total_sales']))
+        .rename(columns={'total_sales': 'Total Sales', 'order_count': 'Order Count'})
+    ).head(10)
+
+
+def order_status_report(aggregates):
+    return (
+        aggregates['status'][['order_count']]
+        .rename(columns={
+            'order_count': 'Order Count'})
+    )
+
+
+def sales_region_report(aggregates):
+    region_sales = aggregates['region']
+    region_totals = region_sales.groupby(level='region').sum()
+
+    region_totals['country'] = 'REGIONAL TOTAL'
+    region_totals = region_totals.set_index('country', append=True)
+
+    return ((pd.concat([region_sales, region_totals])
+             .sort_values(by=['region', 'total_sales'], ascending=[True, False]))
+            .assign(total_sales=lambda df: format_currency(df['total_sales']))
+            .rename(columns={'total_sales': 'Total Sales', 'order_count': 'Order Count'})
+            )
+
+
+def top_states_report(aggregates):
+    return (
+        aggregates['state']
+        .sort_values(by='total_sales', ascending=False)
+        .assign(total_sales=lambda df: format_currency(df['total_sales']))
+        .rename(columns={'total_sales': 'Total Sales', 'order_count': 'Order Count'})
+    )
+
+
+# Report name -> builder, in the order of build_reports' result
+REPORT_BUILDERS = {
+    'top_dates': top_dates_report,
+    'order_status': order_status_report,
+    'sales_region': sales_region_report,
+    'top_states': top_states_report,
+}
+
+# Report name -> the aggregate table it is built from
+REPORT_AGGREGATES = {
+    'top_dates': 'order_date',
+    'order_status': 'status',
+    'sales_region': 'region',
+    'top_states': 'state',
+}
+
+
+def build_reports(aggregates):
+    return tuple(builder(aggregates) for builder in REPORT_BUILDERS.values())
+
+
+class SalesReport:
+    def __init__(self, input_path="Portfolio/Data/sales_data.csv", output_path="Portfolio/Data/trimmed_data.csv",
+                 chunk_size=None, state_path=None, cache_path=None, write_csv=True,
+                 report_dir="Portfolio/Reports"):
+        self.input = input_path
+        self.output = output_path
+        self.chunk_size = chunk_size
+        self.state_path = state_path
+        self.cache_path = cache_path
+        self.write_csv = write_csv
+        self.clean_data = None
+        self.data = None
+        self.aggregates = None
+        self.report_dates = os.path.join(report_dir, "Top_Dates_Report.csv")
+        self.report_order_status = os.path.join(report_dir, "Order_Status_Report.csv")
+        self.report_sales_region = os.path.join(report_dir, "Regional_Sales_Report.csv")
+        self.report_us_states = os.path.join(report_dir, "US_States_Report.csv")
+        self.report_chart = os.path.join(report_dir, "Chart_Report.html")
+
+    def load_data(self):
+        with stage('load_data', path=self.input) as record:
+            try:
+                self.data = read_sales(self.input)
+                record['rows_in'] = record['rows_out'] = len(self.data)
+            except FileNotFoundError:
+                print(f"The file {self.input} was not found.")
+            except pd.errors.EmptyDataError:
+                print(f"The file {self.input} is empty.")
+
+    def process_data(self):
+        with stage('process_data', rows_in=len(self.data)) as record:
+            self.clean_data = clean_sales(self.data)
+            if self.write_csv:
+                self.clean_data.to_csv(self.output, index=False)
+            if self.cache_path:
+                self.save_cache()
+            record['rows_out'] = len(self.clean_data)
+        return self.clean_data
+
+    def load_cache(self):
+        # The cached clean table is reused when the input file and clean_schema() are unchanged. Size and mtime
+        # are checked first; the content hash is only recomputed when they differ (e.g. the file was touched or
+        # copied).
+        meta_path = self.cache_path + '.json'
+        if not (os.path.exists(self.cache_path) and os.path.exists(meta_path)):
+            return False
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta.get('schema') != clean_schema():
+            return False
+
+        fingerprint = file_fingerprint(self.input, with_hash=False)
+        if fingerprint is None:
+            return False
+        if (fingerprint['size'], fingerprint['mtime_ns']) != (meta['size'], meta['mtime_ns']):
+            fingerprint = file_fingerprint(self.input)
+            if fingerprint['sha256'] != meta['sha256']:
+                return False
+            with open(meta_path, 'w') as f:
+                json.dump({**fingerprint, 'schema': meta['schema']}, f)
+
+        try:
+            self.clean_data = pd.read_parquet(self.cache_path)
+        except ImportError:
+            return False
+        return True
+
+    def save_cache(self):
+        try:
+            self.clean_data.astype({col: 'category' for col in CATEGORICAL_COLUMNS}).to_parquet(self.cache_path,
+                                                                                               index=False)
+        except ImportError:
+            print("pyarrow is not installed, the clean data cache was not written.")
+            return
+        with open(self.cache_path + '.json', 'w') as f:
+            json.dump({**file_fingerprint(self.input), 'schema': clean_schema()}, f)
+
+    def create_report(self):
+        with stage('aggregate_sales', rows_in=len(self.clean_data)) as record:
+            self.aggregates = aggregate_sales(self.clean_data)
+            record['rows_out'] = sum(len(table) for table in self.aggregates.values())
+        self.write_reports()
+
+    def write_reports(self):
+        paths = {
+            'top_dates': self.report_dates,
+            'order_status': self.report_order_status,
+            'sales_region': self.report_sales_region,
+            'top_states': self.report_us_states,
+        }
+        for name, builder in REPORT_BUILDERS.items():
+            with stage(f'report:{name}', rows_in=len(self.aggregates[REPORT_AGGREGATES[name]]),
+                       path=paths[name]) as record:
+                report = builder(self.aggregates)
+                report.to_csv(paths[name], index=True)
+                record['rows_out'] = len(report)
+
+    def create_chart(self):
+        if self.aggregates is None:
+            self.aggregates = aggregate_sales(self.clean_data)
+        rows = len(self.aggregates['product_line'])
+        with stage('create_chart', rows_in=rows, rows_out=rows, path=self.report_chart):
+            self.write_chart()
+
+    def write_chart(self):
+        import plotly.graph_objects as go
+
+        by_product = self.aggregates['product_line'].reset_index()
+        sales_by_product = by_product[['product_line', 'total_sales']]
+        order_count = by_product[['product_line', 'order_count']].rename(columns={'order_count': 'order_id'})
+        x_labels = [label.replace(' ', '<br>') for label in sales_by_product['product_line']]
+
+        chart = go.Figure()
+        chart.add_trace(go.Bar(
+            x=x_labels,
+            y=sales_by_product['total_sales'], customdata=order_count['order_id'],
+            marker_color='rgb(55, 83, 109)',
+            text=sales_by_product['total_sales'],
+            textposition='auto'
+        ))
+
+        chart.update_layout(xaxis_title="Product Line",
+                            yaxis_title="Total Sales (US$)",
+                            title=dict(text="Sales Report",
+                                       subtitle=dict(
+                                           text="Total Sales by Product Line",
+                                           font=dict(color="gray", size=13))),
+                            barmode="stack",
+                            legend_traceorder='normal',
+                            )
+        chart.update_traces(texttemplate='$%{text:,.2f}<br>Order Count:<br>%{customdata}', textposition='outside')
+
+        chart.write_html(self.report_chart)
+
+    def run_streaming(self):
+        # Reads the input in chunks of `chunk_size` rows, cleaning each chunk and folding it into running
+        # group-by accumulators. Peak memory depends on the chunk size and number of groups, not the file size.
+        aggregates = None
+        header = True
+        with stage('stream_chunks', rows_in=0, rows_out=0, path=self.input) as record:
+            try:
+                reader = read_sales(self.input, chunksize=self.chunk_size)
+                for chunk in reader:
+                    clean_chunk = clean_sales(chunk)
+                    clean_chunk.to_csv(self.output, mode='w' if header else 'a', header=header, index=False)
+                    header = False
+                    aggregates = merge_aggregates(aggregates, aggregate_sales(clean_chunk))
+                    record['rows_in'] += len(chunk)
+                    record['rows_out'] += len(clean_chunk)
+            except FileNotFoundError:
+                print(f"The file {self.input} was not found.")
+                return
+            except pd.errors.EmptyDataError:
+                print(f"The file {self.input} is empty.")
+                return
+
+        self.aggregates = aggregates
+        self.write_reports()
+        self.create_chart()
+
+    def load_state(self):
+        if self.state_path is None or not os.path.exists(self.state_path):
+            return None
+        return pd.read_pickle(self.state_path)
+
+    def save_state(self, state):
+        pd.to_pickle(state, self.state_path)
+
+    def run_incremental(self):
+        # Folds only the rows not seen by a previous run into the saved aggregates. Rows are tracked with an
+        # order_date watermark plus the order_ids already seen on the watermark date, so the input can be either
+        # a delta export or the full history. Orders dated before the watermark are treated as already counted.
+        state = self.load_state()
+        if state is None:
+            aggregates, seen_until, seen_orders = None, None, set()
+        else:
+            aggregates, seen_until, seen_orders = state['aggregates'], state['watermark'], state['watermark_orders']
+        watermark, watermark_orders = seen_until, set(seen_orders)
+
+        header = state is None or not os.path.exists(self.output)
+        with stage('stream_new_rows', rows_in=0, rows_out=0, path=self.input) as record:
+            try:
+                reader = read_sales(self.input, chunksize=self.chunk_size or 100_000)
+                for chunk in reader:
+                    record['rows_in'] += len(chunk)
+                    clean_chunk = unseen_orders(clean_sales(chunk), seen_until, seen_orders)
+                    if clean_chunk.empty:
+                        continue
+
+                    clean_chunk.to_csv(self.output, mode='w' if header else 'a', header=header, index=False)
+                    header = False
+                    aggregates = merge_aggregates(aggregates, aggregate_sales(clean_chunk))
+                    record['rows_out'] += len(clean_chunk)
+                    watermark, watermark_orders = advance_watermark(clean_chunk, watermark, watermark_orders)
+            except FileNotFoundError:
+                print(f"The file {self.input} was not found.")
+                return
+            except pd.errors.EmptyDataError:
+                print(f"The file {self.input} is empty.")
+                return
+
+        if aggregates is None:
+            print("No orders to report.")
+            return
+
+        self.save_state({'aggregates': aggregates, 'watermark': watermark, 'watermark_orders': watermark_orders})
+        self.aggregates = aggregates
+        self.write_reports()
+        self.create_chart()
+
+    def run(self):
+        if self.state_path:
+            self.run_incremental()
+            return
+
+        if self.chunk_size:
+            self.run_streaming()
+            return
+
+        if not (self.cache_path and self.load_cache()):
+            self.load_data()
+            if self.data is None:
+                # Nothing to report on; self.aggregates stays None so batch runs can skip this input
+                return
+            self.process_data()
+        self.create_report()
+        self.create_chart()
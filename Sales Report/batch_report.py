@@ -0,0 +1,77 @@
+import argparse
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from Sales_Report import SalesReport, merge_aggregates
+
+# Runs SalesReport over many per-period / per-subsidiary sales files in a process pool. Each input gets its own
+# report folder, and the per-file aggregates are merged into one set of consolidated reports.
+
+
+def read_manifest(manifest_path):
+    # One input path per line; blank lines and lines starting with '#' are ignored. Relative paths are
+    # resolved against the manifest's folder.
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    with open(manifest_path) as f:
+        lines = [line.strip() for line in f]
+    return [os.path.join(base_dir, line) for line in lines if line and not line.startswith('#')]
+
+
+def report_folders(input_paths, output_dir):
+    # Folder names come from the input file names, numbered when two inputs share a name.
+    folders, seen = [], {}
+    for path in input_paths:
+        name = os.path.splitext(os.path.basename(path))[0]
+        seen[name] = seen.get(name, 0) + 1
+        if seen[name] > 1:
+            name = f"{name}_{seen[name]}"
+        folders.append(os.path.join(output_dir, name))
+    return folders
+
+
+def report_one(input_path, report_dir, chunk_size=None):
+    os.makedirs(report_dir, exist_ok=True)
+    report = SalesReport(input_path, os.path.join(report_dir, "trimmed_data.csv"), chunk_size=chunk_size,
+                         report_dir=report_dir)
+    report.run()
+    return report.aggregates
+
+
+def run_batch(input_paths, output_dir, workers=None, chunk_size=None):
+    folders = report_folders(input_paths, output_dir)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(report_one, input_paths, folders, [chunk_size] * len(input_paths)))
+
+    aggregates = None
+    for input_path, partial in zip(input_paths, results):
+        if partial is None:
+            print(f"No report was produced for {input_path}.")
+            continue
+        aggregates = merge_aggregates(aggregates, partial)
+    if aggregates is None:
+        return None
+
+    consolidated_dir = os.path.join(output_dir, "Consolidated")
+    os.makedirs(consolidated_dir, exist_ok=True)
+    consolidated = SalesReport(report_dir=consolidated_dir)
+    consolidated.aggregates = aggregates
+    consolidated.write_reports()
+    consolidated.create_chart()
+    return aggregates
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create sales reports for many input files in parallel.")
+    inputs = parser.add_mutually_exclusive_group(required=True)
+    inputs.add_argument("--glob", help="Glob pattern matching the sales_data CSV files, e.g. 'Data/*/sales_*.csv'")
+    inputs.add_argument("--manifest", help="Text file listing one input CSV per line")
+    parser.add_argument("--output-dir", default="Reports/Batch")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk-size", type=int, default=None, help="Stream each input in chunks of this many rows")
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(args.glob, recursive=True)) if args.glob else read_manifest(args.manifest)
+    if not paths:
+        parser.error("No input files found.")
+    run_batch(paths, args.output_dir, workers=args.workers, chunk_size=args.chunk_size)
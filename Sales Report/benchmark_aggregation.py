@@ -0,0 +1,131 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from Sales_Report import aggregate_sales, build_reports
+
+# Compares the single-scan aggregation engine (aggregate_sales + build_reports) against the original
+# multi-pass groupby implementation of create_report/create_chart on a synthetic order table.
+
+REGIONS = {
+    'North America': ['USA', 'Canada'],
+    'EMEA': ['France', 'Spain', 'UK', 'Germany', 'Italy', 'Sweden', 'Norway', 'Finland', 'Denmark', 'Austria',
+             'Belgium', 'Switzerland', 'Ireland'],
+    'APAC': ['Australia', 'Singapore', 'New Zealand', 'Philippines', 'Japan'],
+}
+STATUSES = ['Shipped', 'Cancelled', 'Resolved', 'On Hold', 'In Process', 'Disputed']
+PRODUCT_LINES = ['Classic Cars', 'Vintage Cars', 'Motorcycles', 'Planes', 'Trucks and Buses', 'Ships', 'Trains']
+US_STATES = ['CA', 'MA', 'NY', 'NJ', 'PA', 'CT', 'NH', 'NV']
+
+
+def synthetic_clean_data(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    countries = [(region, country) for region, names in REGIONS.items() for country in names]
+    country_idx = rng.integers(0, len(countries), rows)
+    region = np.array([c[0] for c in countries], dtype=object)[country_idx]
+    country = np.array([c[1] for c in countries], dtype=object)[country_idx]
+    state = np.where(country == 'USA', np.array(US_STATES, dtype=object)[rng.integers(0, len(US_STATES), rows)],
+                     None)
+    days = pd.Timestamp('2003-01-01') + pd.to_timedelta(rng.integers(0, 3 * 365, rows), unit='D')
+    quantity = rng.integers(6, 98, rows)
+    price = np.round(rng.uniform(26.88, 252.87, rows), 2)
+
+    return pd.DataFrame({
+        'order_id': rng.integers(10100, 10100 + rows // 10 + 1, rows),
+        'quantity_ordered': quantity,
+        'price_each': price,
+        'order_date': days,
+        'status': np.array(STATUSES, dtype=object)[rng.integers(0, len(STATUSES), rows)],
+        'product_line': np.array(PRODUCT_LINES, dtype=object)[rng.integers(0, len(PRODUCT_LINES), rows)],
+        'state': state,
+        'country': country,
+        'region': region,
+        'total_sales': quantity * price,
+    })
+
+
+def multi_pass_reports(clean_data):
+    # The original implementation: four groupby passes in create_report and two in create_chart.
+    report_top_dates = (
+        clean_data
+        .groupby('order_date')
+        .agg(total_sales=('total_sales', 'sum'), order_count=('order_id', 'count'))
+        .sort_values(by='total_sales', ascending=False)
+        .assign(total_sales=lambda df: df['total_sales'].apply(lambda s: f'${s:,.2f}'))
+        .rename(columns={'total_sales': 'Total Sales', 'order_count': 'Order Count'})
+    ).head(10)
+
+    report_order_status = (
+        clean_data
+        .groupby('status')
+        .agg(order_count=('order_id', 'count'))
+        .rename(columns={'order_count': 'Order Count'})
+    )
+
+    region_sales = clean_data.groupby(['region', 'country']).agg(
+        total_sales=('total_sales', 'sum'),
+        order_count=('order_id', 'count'))
+    region_totals = region_sales.groupby(level='region').sum()
+    region_totals['country'] = 'REGIONAL TOTAL'
+    region_totals = region_totals.set_index('country', append=True)
+    report_sales_region = ((pd.concat([region_sales, region_totals])
+                            .sort_values(by=['region', 'total_sales'], ascending=[True, False]))
+                           .assign(total_sales=lambda df: df['total_sales'].apply(lambda s: f'${s:,.2f}'))
+                           .rename(columns={'total_sales': 'Total Sales', 'order_count': 'Order Count'}))
+
+    report_top_states = (
+        clean_data[clean_data.country == 'USA']
+        .groupby('state')
+        .agg(total_sales=('total_sales', 'sum'), order_count=('order_id', 'count'))
+        .sort_values(by='total_sales', ascending=False)
+        .assign(total_sales=lambda df: df['total_sales'].apply(lambda s: f'${s:,.2f}'))
+        .rename(columns={'total_sales': 'Total Sales', 'order_count': 'Order Count'})
+    )
+
+    clean_data.groupby('product_line')['total_sales'].sum().reset_index()
+    clean_data.groupby('product_line')['order_id'].count().reset_index()
+
+    return report_top_dates, report_order_status, report_sales_region, report_top_states
+
+
+def single_scan_reports(clean_data):
+    return build_reports(aggregate_sales(clean_data))
+
+
+def best_of(func, data, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(data)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the sales report aggregation engine.")
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    data = synthetic_clean_data(args.rows)
+    print(f"Rows: {args.rows:,}")
+
+    # Plain string key columns and categorical key columns (as produced by read_sales and the Parquet cache)
+    layouts = {
+        'string keys': data,
+        'categorical keys': data.astype({col: 'category' for col in ['status', 'region', 'country', 'product_line']}),
+    }
+    for layout, table in layouts.items():
+        multi_time, multi_result = best_of(multi_pass_reports, table, args.repeat)
+        single_time, single_result = best_of(single_scan_reports, table, args.repeat)
+
+        for expected, actual in zip(multi_result, single_result):
+            pd.testing.assert_frame_equal(expected.reset_index(), actual.reset_index(), check_dtype=False,
+                                          check_index_type=False, check_categorical=False)
+
+        print(f"\n{layout}")
+        print(f"Multi-pass groupby: {multi_time:.3f}s")
+        print(f"Single-scan engine: {single_time:.3f}s")
+        print(f"Speedup: {multi_time / single_time:.2f}x")
@@ -0,0 +1,49 @@
+import argparse
+import os
+import time
+
+import pandas as pd
+
+from Sales_Report import clean_sales, read_sales
+
+# Compares the original ingestion (inferred dtypes, every column read, inferred date format converted to Python
+# date objects) with the explicit ingestion schema used by read_sales/clean_sales. Reports parse time and the
+# in-memory size of the cleaned table for both.
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def legacy_ingest(path):
+    df = pd.read_csv(path, encoding='ISO-8859-1')
+    columns_to_drop = ['phone', 'address_line_1', 'address_line_2', 'contact_first_name', 'contact_last_name',
+                       'online_order_number', 'postal_code']
+    df_drop = df.drop(columns=[col for col in columns_to_drop if col in df.columns])
+    df_drop['territory'] = df_drop['territory'].replace('Japan', 'APAC')
+    df_drop['territory'] = df_drop['territory'].fillna('North America')
+    df_drop['order_date'] = pd.to_datetime(df_drop['order_date']).dt.date
+    df_drop['total_sales'] = df_drop['quantity_ordered'] * df_drop['price_each']
+    return df_drop.rename(columns={'territory': 'region'})
+
+
+def schema_ingest(path):
+    return clean_sales(read_sales(path))
+
+
+def measure(func, path, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        clean = func(path)
+        timings.append(time.perf_counter() - start)
+    return min(timings), clean.memory_usage(deep=True).sum()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark sales ingestion with and without the dtype schema.")
+    parser.add_argument("--input", default=os.path.join(HERE, "Data", "sales_data.csv"))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for label, func in [("Before (inferred dtypes)", legacy_ingest), ("After (ingestion schema)", schema_ingest)]:
+        elapsed, memory = measure(func, args.input, args.repeat)
+        print(f"{label}: parse {elapsed:.3f}s, memory {memory / 2 ** 20:.2f} MiB")
@@ -0,0 +1,61 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# Measures how long Sales_Report takes to import (via `python -X importtime`) and the wall time of a fresh
+# interpreter producing the CSV reports for the sample data, and checks the latter against a budget.
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+FIRST_REPORT = """
+import sys
+from Sales_Report import SalesReport
+report = SalesReport(sys.argv[1], sys.argv[2] + '/trimmed_data.csv', report_dir=sys.argv[2])
+report.load_data()
+report.process_data()
+report.create_report()
+"""
+
+
+def import_times(module="Sales_Report"):
+    # Returns {module: cumulative microseconds} for every module imported by `module`.
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=HERE, capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = [part.strip() for part in line[len("import time:"):].split("|")]
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def time_to_first_report(input_path):
+    with tempfile.TemporaryDirectory() as report_dir:
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", FIRST_REPORT, input_path, report_dir], cwd=HERE, check=True,
+                       capture_output=True)
+        return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark Sales_Report startup time.")
+    parser.add_argument("--input", default=os.path.join(HERE, "Data", "sales_data.csv"))
+    parser.add_argument("--budget", type=float, default=2.0, help="Time-to-first-report budget in seconds")
+    args = parser.parse_args()
+
+    times = import_times()
+    print(f"Import Sales_Report: {times['Sales_Report'] / 1e6:.3f}s")
+    for heavy in ["pandas", "numpy", "plotly", "matplotlib", "seaborn", "statsmodels"]:
+        if heavy in times:
+            print(f"  {heavy}: {times[heavy] / 1e6:.3f}s")
+        else:
+            print(f"  {heavy}: not imported")
+
+    elapsed = time_to_first_report(args.input)
+    print(f"Time to first report: {elapsed:.3f}s (budget {args.budget:.3f}s)")
+    if elapsed > args.budget:
+        sys.exit(f"Time to first report is over budget by {elapsed - args.budget:.3f}s")
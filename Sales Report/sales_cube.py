@@ -0,0 +1,116 @@
+import argparse
+import json
+import os
+
+import pandas as pd
+
+from Sales_Report import advance_watermark, clean_sales, read_sales, unseen_orders
+
+# Pre-aggregated rollup cube over the cleaned sales table. The cube holds one row per observed combination of
+# the dimensions below with additive measures, so any group-by/filter over those dimensions can be answered
+# from the cube without rescanning the raw orders, and new orders can be folded in incrementally. Like the
+# incremental SalesReport, the cube keeps an order_date watermark (and the order_ids seen on that date) in a JSON
+# sidecar next to the saved cube, so folding in an export that overlaps earlier ones only adds the unseen orders.
+
+DIMENSIONS = ['year_id', 'qtr_id', 'month_id', 'order_date', 'region', 'country', 'state', 'product_line',
+              'deal_size', 'status']
+MEASURES = ['total_sales', 'quantity_ordered', 'order_count']
+
+
+def rollup(clean_data):
+    return (clean_data
+            .groupby(DIMENSIONS, observed=True, dropna=False)
+            .agg(total_sales=('total_sales', 'sum'),
+                 quantity_ordered=('quantity_ordered', 'sum'),
+                 order_count=('order_id', 'count'))
+            .reset_index())
+
+
+class SalesCube:
+    def __init__(self, cells=None, watermark=None, watermark_orders=None):
+        self.cells = cells if cells is not None else pd.DataFrame(columns=DIMENSIONS + MEASURES)
+        self.watermark = watermark
+        self.watermark_orders = set(watermark_orders or ())
+
+    @classmethod
+    def from_clean_data(cls, clean_data):
+        watermark, watermark_orders = advance_watermark(clean_data, None, set())
+        return cls(cls._compact(rollup(clean_data)), watermark, watermark_orders)
+
+    @classmethod
+    def load(cls, path):
+        watermark, watermark_orders = None, set()
+        if os.path.exists(path + '.json'):
+            with open(path + '.json') as f:
+                meta = json.load(f)
+            if meta['watermark'] is not None:
+                watermark, watermark_orders = pd.Timestamp(meta['watermark']), meta['watermark_orders']
+        return cls(pd.read_parquet(path), watermark, watermark_orders)
+
+    def save(self, path):
+        self.cells.to_parquet(path, index=False)
+        with open(path + '.json', 'w') as f:
+            json.dump({'watermark': None if self.watermark is None else self.watermark.isoformat(),
+                       'watermark_orders': sorted(int(order_id) for order_id in self.watermark_orders)}, f)
+
+    def update(self, new_clean_data):
+        # Folds newly arrived (cleaned) orders into the cube. Only the new rows and the existing cells are
+        # grouped, never the full order history. Orders already covered by the watermark are skipped, so the
+        # input can be a delta export or the full cumulative one.
+        new_clean_data = unseen_orders(new_clean_data, self.watermark, self.watermark_orders)
+        if new_clean_data.empty:
+            return self
+        self.watermark, self.watermark_orders = advance_watermark(new_clean_data, self.watermark,
+                                                                  self.watermark_orders)
+        combined = pd.concat([self.cells, rollup(new_clean_data)], ignore_index=True)
+        for dim in DIMENSIONS:
+            if isinstance(combined[dim].dtype, pd.CategoricalDtype):
+                combined[dim] = combined[dim].astype(combined[dim].cat.categories.dtype)
+        self.cells = self._compact(combined
+                                   .groupby(DIMENSIONS, observed=True, dropna=False)[MEASURES]
+                                   .sum()
+                                   .reset_index())
+        return self
+
+    def query(self, by=None, filters=None):
+        """
+        Aggregate the cube by any combination of dimensions.
+
+        Parameters
+        ----------
+        by : list of str, optional
+            Dimensions to group by. When omitted the grand totals are returned.
+        filters : dict, optional
+            Maps a dimension to a single value or a list of allowed values, e.g. {'region': 'EMEA'}.
+        """
+        cells = self.cells
+        for dim, values in (filters or {}).items():
+            allowed = values if isinstance(values, (list, tuple, set)) else [values]
+            cells = cells[cells[dim].isin(allowed)]
+
+        if not by:
+            return cells[MEASURES].sum().to_frame().T.astype(cells[MEASURES].dtypes.to_dict())
+        return cells.groupby(list(by), observed=True)[MEASURES].sum()
+
+    @staticmethod
+    def _compact(cells):
+        # Dimensions are stored as categoricals and counts as integers to keep the cube small
+        for dim in ['region', 'country', 'state', 'product_line', 'deal_size', 'status']:
+            cells[dim] = cells[dim].astype('category')
+        return cells.astype({'quantity_ordered': 'int64', 'order_count': 'int64'})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or update the sales rollup cube.")
+    parser.add_argument("--input", default="Data/sales_data.csv", help="Sales export to add to the cube")
+    parser.add_argument("--cube", default="Data/sales_cube.parquet")
+    args = parser.parse_args()
+
+    new_orders = clean_sales(read_sales(args.input))
+    if os.path.exists(args.cube):
+        cube = SalesCube.load(args.cube).update(new_orders)
+    else:
+        cube = SalesCube.from_clean_data(new_orders)
+    cube.save(args.cube)
+    print(f"Cube has {len(cube.cells):,} cells")
+    print(cube.query(by=['product_line', 'qtr_id', 'region']).head(10))
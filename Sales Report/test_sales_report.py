@@ -0,0 +1,39 @@
+import os
+
+import pandas as pd
+import pytest
+
+from Sales_Report import SalesReport, read_sales
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SALES_FILE = os.path.join(HERE, "Data", "sales_data.csv")
+
+
+@pytest.fixture
+def blank_cells_file(tmp_path):
+    # The first 200 orders of the export, with blank integer cells in the first two rows
+    raw = pd.read_csv(SALES_FILE, encoding="ISO-8859-1", nrows=200, dtype=str, keep_default_na=False)
+    raw.loc[0, "quantity_ordered"] = ""
+    raw.loc[1, ["year_id", "MSPR"]] = ""
+    path = tmp_path / "sales_blank.csv"
+    raw.to_csv(path, index=False, encoding="ISO-8859-1")
+    return path
+
+
+def test_read_sales_reads_blank_integer_cells_as_missing(blank_cells_file):
+    df = read_sales(blank_cells_file)
+
+    assert len(df) == 200
+    assert pd.isna(df.loc[0, "quantity_ordered"])
+    assert df.loc[1, ["year_id", "MSPR"]].isna().all()
+
+
+@pytest.mark.parametrize("chunk_size", [None, 50])
+def test_report_runs_with_a_blank_quantity(blank_cells_file, tmp_path, chunk_size):
+    report = SalesReport(str(blank_cells_file), str(tmp_path / "trimmed.csv"), chunk_size=chunk_size,
+                         report_dir=str(tmp_path))
+    report.run()
+
+    # The order with no quantity still counts as an order, with no sales
+    assert report.aggregates["status"]["order_count"].sum() == 200
+    assert os.path.exists(tmp_path / "Top_Dates_Report.csv")
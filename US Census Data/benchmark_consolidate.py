@@ -0,0 +1,74 @@
+import argparse
+import glob
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from census import consolidate
+
+# Throughput benchmark for the census consolidator: writes a synthetic set of shards with the same layout as
+# 'Raw Data CSVs/states*.csv' (including repeated rows and missing female counts), then times the original
+# sequential loop + concat + drop_duplicates + row-wise cleaning against census.consolidate.
+
+
+def write_shards(directory, shards, rows_per_shard=6, seed=0):
+    rng = np.random.default_rng(seed)
+    for shard in range(shards):
+        total = rng.integers(500_000, 40_000_000, rows_per_shard)
+        male = (total * rng.uniform(0.47, 0.51, rows_per_shard)).astype("int64")
+        female = np.where(rng.random(rows_per_shard) < 0.05, "", (total - male).astype(str))
+        pct = lambda: [f"{v:.2f}%" for v in rng.uniform(0, 90, rows_per_shard)]
+        df = pd.DataFrame({
+            "State": [f"State {shard}-{row}" for row in range(rows_per_shard)],
+            "TotalPop": total,
+            "Hispanic": pct(), "White": pct(), "Black": pct(), "Native": pct(), "Asian": pct(),
+            "Pacific": [f"{v:.2f}%" if v > 0.05 else None for v in rng.uniform(0, 1, rows_per_shard)],
+            "Income": [f"${v:,.2f} " for v in rng.uniform(35_000, 80_000, rows_per_shard)],
+            "GenderPop": [f"{m}M_{f}F" for m, f in zip(male, female)],
+        })
+        # Every tenth shard repeats rows from the previous shard, as the real feed does
+        if shard % 10 == 9:
+            df.iloc[:2] = previous.iloc[:2].to_numpy()
+        previous = df
+        df.to_csv(os.path.join(directory, f"states{shard}.csv"), encoding="utf-8-sig")
+
+
+def sequential_consolidate(files):
+    # The original implementation
+    df = pd.concat([pd.read_csv(file) for file in files])
+    df.columns = df.columns.str.lower()
+    df = df.drop_duplicates().reset_index(drop=True)
+    df['pacific'] = df.pacific.fillna(float(0))
+    df['male_pop'] = (df.genderpop.str.split(r'(\d+)', expand=True)[1]).astype("int64")
+    df['female_pop'] = df['totalpop'] - df['male_pop']
+    df["income"] = df["income"].apply(lambda x: x.translate(str.maketrans('', '', '$,'))).astype("float")
+    cols_to_strip = ["white", "hispanic", "black", "native", "asian", "pacific"]
+    df[cols_to_strip] = df[cols_to_strip].apply(lambda x: x.str.strip("%")).astype("float")
+    return df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark census shard consolidation.")
+    parser.add_argument("--shards", type=int, default=10_000)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_shards(directory, args.shards)
+        files = sorted(glob.glob(os.path.join(directory, "states*.csv")))
+
+        start = time.perf_counter()
+        expected = sequential_consolidate(files)
+        sequential = time.perf_counter() - start
+
+        start = time.perf_counter()
+        result = consolidate(files, workers=args.workers)
+        concurrent = time.perf_counter() - start
+
+    assert len(expected) == len(result), (len(expected), len(result))
+    print(f"Shards: {args.shards:,} ({len(result):,} distinct rows)")
+    print(f"Sequential loop:     {sequential:.2f}s ({args.shards / sequential:,.0f} shards/s)")
+    print(f"Concurrent consolidate ({args.workers} threads): {concurrent:.2f}s ({args.shards / concurrent:,.0f} shards/s)")
@@ -0,0 +1,173 @@
+import glob
+import hashlib
+import io
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+# Consolidation of the US Census 'states*.csv' shards. Shards are read concurrently as raw text, duplicate records are
+# dropped as each shard arrives, and the deduplicated records are parsed once with a declared schema. The text fields
+# are then cleaned with vectorized string operations.
+# Census shards are only a few rows each, so building a DataFrame per shard costs far more than reading the file;
+# parsing every record in a single read_csv call avoids that per-shard overhead.
+# load_census caches the consolidated table as Parquet next to the shards and reuses it while the shard set (names,
+# sizes and mtimes) is unchanged.
+
+CACHE_FILE = "census_cache.parquet"
+
+# Percentage, currency and gender fields are read as text and cleaned by parse_census
+SHARD_DTYPES = {
+    "Unnamed: 0": "int64",
+    "State": "str",
+    "TotalPop": "int64",
+    "Hispanic": "str",
+    "White": "str",
+    "Black": "str",
+    "Native": "str",
+    "Asian": "str",
+    "Pacific": "str",
+    "Income": "str",
+    "GenderPop": "str",
+}
+
+PERCENT_COLUMNS = ["white", "hispanic", "black", "native", "asian", "pacific"]
+
+# Column order of the consolidated table
+COLUMNS = ["state", "total_pop", "male_pop", "female_pop", "white_%", "hispanic_%", "black_%", "native_%", "asian_%",
+           "pacific_%", "avg_income"]
+
+
+def read_shard(path):
+    # Header and records of one shard as text lines. utf-8-sig drops the byte order mark some shards start with.
+    # Census records never contain line breaks, so every line is one record.
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        header, *records = f.read().splitlines()
+    return header, records
+
+
+def parse_census(raw):
+    df = raw.copy()
+
+    # Altering the columns to get a uniform case convention.
+    df.columns = df.columns.str.lower()
+
+    # 'pacific' has null values where fewer than 0.01% Pacific peoples live in the state, so they become 0
+    df[PERCENT_COLUMNS] = df[PERCENT_COLUMNS].apply(lambda col: col.str.rstrip("%")).astype("float64")
+    df["pacific"] = df["pacific"].fillna(0.0)
+
+    # 'genderpop' holds values like '415644M_456415F' (415644 males and 456415 females). Some rows have no female
+    # count ('415644M_F'), so female_pop is total_pop minus male_pop.
+    df["male_pop"] = df["genderpop"].str.extract(r"^(\d+)M", expand=False).astype("int64")
+    df["female_pop"] = df["totalpop"] - df["male_pop"]
+
+    # Remove the currency sign, thousands separators and trailing whitespace from 'income'
+    df["avg_income"] = df["income"].str.replace(r"[$,\s]", "", regex=True).astype("float64")
+
+    df = df.rename(columns={"totalpop": "total_pop", "white": "white_%", "hispanic": "hispanic_%", "black": "black_%",
+                            "native": "native_%", "asian": "asian_%", "pacific": "pacific_%"})
+    return df[COLUMNS]
+
+
+def consolidate(files, workers=8):
+    """
+    Read, deduplicate and clean a set of census shards.
+
+    Parameters
+    ----------
+    files : list of str
+        Paths of the shard CSV files. The output keeps their order.
+    workers : int
+        Number of threads reading shards concurrently.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per distinct record with the columns in COLUMNS.
+    """
+    expected_header = None
+    seen = set()
+    kept = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for path, (header, records) in zip(files, executor.map(read_shard, files)):
+            if expected_header is None:
+                expected_header = header
+            elif header != expected_header:
+                raise ValueError(f"{path} does not have the same columns as {files[0]}")
+
+            # Drop records already seen in an earlier shard (or earlier in this one) while streaming
+            for record in records:
+                if record not in seen:
+                    seen.add(record)
+                    kept.append(record)
+
+    if expected_header is None:
+        return pd.DataFrame(columns=COLUMNS)
+    raw = pd.read_csv(io.StringIO("\n".join([expected_header, *kept])), dtype=SHARD_DTYPES)
+    return parse_census(raw)
+
+
+def shard_files(path_glob):
+    # Sorted, so the consolidated rows keep the same order from run to run
+    return sorted(glob.glob(path_glob))
+
+
+def shard_fingerprint(files):
+    # Changes whenever a shard is added, removed, renamed, resized or modified
+    digest = hashlib.sha256()
+    for path in files:
+        stat = os.stat(path)
+        digest.update(f"{os.path.abspath(path)}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+    return {"shards": len(files), "fingerprint": digest.hexdigest()}
+
+
+def load_census(path_glob, cache_path=None, workers=8, refresh=False):
+    """
+    Consolidated, typed census table for the shards matching `path_glob`, served from the on-disk cache when the
+    shard set has not changed.
+
+    Parameters
+    ----------
+    path_glob : str
+        Glob matching the shard CSV files, e.g. 'Raw Data CSVs/states*.csv'.
+    cache_path : str, optional
+        Parquet file holding the cached table. Defaults to CACHE_FILE in the deepest directory holding every
+        matched shard (the glob's own directory part may contain wildcards). Its fingerprint is stored alongside it
+        in `cache_path + '.json'`.
+    workers : int
+        Number of threads reading shards when the cache is rebuilt.
+    refresh : bool
+        Rebuild the cache even if the shard set is unchanged.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per distinct record with the columns in COLUMNS.
+    """
+    files = shard_files(path_glob)
+    if not files:
+        raise FileNotFoundError(f"No census shards match {path_glob!r}")
+    if cache_path is None:
+        cache_path = os.path.join(os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in files]),
+                                  CACHE_FILE)
+    meta_path = cache_path + ".json"
+
+    fingerprint = shard_fingerprint(files)
+    if not refresh and os.path.exists(cache_path) and os.path.exists(meta_path):
+        with open(meta_path) as f:
+            if json.load(f) == fingerprint:
+                try:
+                    return pd.read_parquet(cache_path)
+                except ImportError:
+                    pass
+
+    df = consolidate(files, workers=workers)
+    try:
+        df.to_parquet(cache_path, index=False)
+    except ImportError:
+        # Without pyarrow the table is still returned, just not cached
+        return df
+    with open(meta_path, "w") as f:
+        json.dump(fingerprint, f)
+    return df
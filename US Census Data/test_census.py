@@ -0,0 +1,33 @@
+import os
+import shutil
+
+from census import CACHE_FILE, load_census
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SHARDS = os.path.join(HERE, "Raw Data CSVs")
+
+
+def copy_shards(directory, names):
+    os.makedirs(directory)
+    for name in names:
+        shutil.copy(os.path.join(SHARDS, name), directory)
+
+
+def test_load_census_caches_next_to_shards_matched_by_a_wildcard_directory(tmp_path):
+    copy_shards(tmp_path / "east", ["states0.csv", "states1.csv"])
+    copy_shards(tmp_path / "west", ["states2.csv"])
+
+    df = load_census(str(tmp_path / "*" / "states*.csv"), workers=1)
+
+    assert (tmp_path / CACHE_FILE).exists()
+    assert (tmp_path / (CACHE_FILE + ".json")).exists()
+    # The second call is served from the cache and returns the same table
+    assert load_census(str(tmp_path / "*" / "states*.csv"), workers=1).equals(df)
+
+
+def test_load_census_caches_in_the_single_shard_directory(tmp_path):
+    copy_shards(tmp_path / "shards", ["states0.csv"])
+
+    load_census(str(tmp_path / "shards" / "states*.csv"), workers=1)
+
+    assert (tmp_path / "shards" / CACHE_FILE).exists()
@@ -0,0 +1,167 @@
+import itertools
+import json
+import os
+import re
+import resource
+import time
+import uuid
+from contextlib import contextmanager
+
+# Opt-in stage instrumentation for the report workflows. A stage is a block of work wrapped in `stage(name)`; when
+# PORTFOLIO_METRICS names a file, every stage appends one JSON line to it with its duration, input/output rows and
+# memory (RSS before/after and the process peak), and with PORTFOLIO_PROFILE set each stage is also profiled with
+# cProfile or pyinstrument. When PORTFOLIO_METRICS is unset, stage() only hands back the record dict and costs
+# nothing else. Settings are environment variables so worker processes started by a workflow inherit them.
+#
+#   PORTFOLIO_METRICS=metrics.jsonl python Portfolio_Workflow.py
+#   PORTFOLIO_METRICS=metrics.jsonl PORTFOLIO_PROFILE=cprofile python -c "..."
+
+METRICS_ENV = "PORTFOLIO_METRICS"
+PROFILE_ENV = "PORTFOLIO_PROFILE"
+RUN_ID_ENV = "PORTFOLIO_RUN_ID"
+PROFILERS = ("cprofile", "pyinstrument")
+
+# A profiler is already running in this process: stages nested inside a profiled stage are timed but not profiled
+# separately (only one profiler can be active at a time)
+_profiling = False
+_profile_numbers = itertools.count()
+
+
+def enable(metrics_path, profiler=None):
+    """
+    Turn instrumentation on for this process and the processes it starts.
+
+    Parameters
+    ----------
+    metrics_path : str
+        JSON-lines file the stage records are appended to.
+    profiler : str, optional
+        'cprofile' or 'pyinstrument' to also profile every stage. Profiles are written to a '<metrics>_profiles'
+        directory next to the metrics file.
+    """
+    if profiler is not None and profiler not in PROFILERS:
+        raise ValueError(f"Unknown profiler {profiler!r}, expected one of {PROFILERS}")
+    os.environ[METRICS_ENV] = os.path.abspath(metrics_path)
+    if profiler:
+        os.environ[PROFILE_ENV] = profiler
+    run_id()
+
+
+def run_id():
+    # Shared by the process that set it up and every worker process started afterwards
+    return os.environ.setdefault(RUN_ID_ENV, uuid.uuid4().hex[:12])
+
+
+def enabled():
+    return bool(os.environ.get(METRICS_ENV))
+
+
+def rss_mb():
+    # Current resident set size, from /proc (None where it is not available)
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def peak_rss_mb():
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if os.uname().sysname == "Darwin" else peak / 2 ** 10
+
+
+def rounded(value, digits=1):
+    return None if value is None else round(value, digits)
+
+
+def start_profiler(kind):
+    if kind == "cprofile":
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    else:
+        from pyinstrument import Profiler
+        profiler = Profiler()
+        profiler.start()
+    return profiler
+
+
+def stop_profiler(kind, profiler, name):
+    # Stops the profiler and writes its output; returns the profile path
+    directory = os.path.splitext(os.environ[METRICS_ENV])[0] + "_profiles"
+    os.makedirs(directory, exist_ok=True)
+    slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", name)
+    stem = os.path.join(directory, f"{slug}-{os.getpid()}-{next(_profile_numbers)}")
+    if kind == "cprofile":
+        profiler.disable()
+        profiler.dump_stats(stem + ".prof")
+        return stem + ".prof"
+    profiler.stop()
+    with open(stem + ".html", "w") as f:
+        f.write(profiler.output_html())
+    return stem + ".html"
+
+
+def write_record(record):
+    # One line per write in append mode, so records from concurrent worker processes don't interleave
+    with open(os.environ[METRICS_ENV], "a") as f:
+        f.write(json.dumps(record, default=str) + "\n")
+
+
+@contextmanager
+def stage(name, rows_in=None, **fields):
+    """
+    Measure a stage of work.
+
+    Parameters
+    ----------
+    name : str
+        Stage name, e.g. 'load_data' or 'pdf'.
+    rows_in : int, optional
+        Rows the stage reads.
+    **fields
+        Extra values recorded with the stage (e.g. the output path).
+
+    Yields
+    ------
+    dict
+        The stage record; set record['rows_out'] (or any other key) inside the block to record it.
+    """
+    global _profiling
+    record = {"rows_in": rows_in, "rows_out": None, **fields}
+    if not enabled():
+        yield record
+        return
+
+    run_id()
+    kind = os.environ.get(PROFILE_ENV)
+    profiler = None
+    if kind and not _profiling:
+        profiler, _profiling = start_profiler(kind), True
+    rss_before = rss_mb()
+    start = time.perf_counter()
+    status = "ok"
+    try:
+        yield record
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        if profiler is not None:
+            record["profile"] = stop_profiler(kind, profiler, name)
+            _profiling = False
+        rss_after = rss_mb()
+        write_record({
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "run_id": run_id(),
+            "pid": os.getpid(),
+            "stage": name,
+            "status": status,
+            "seconds": round(seconds, 4),
+            **record,
+            "rss_mb": rounded(rss_after),
+            "rss_delta_mb": rounded(rss_after - rss_before) if rss_after is not None else None,
+            "peak_rss_mb": rounded(peak_rss_mb()),
+        })
@@ -0,0 +1,259 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import pandas as pd
+
+# Pipeline runner for the portfolio workflows. Every workflow is a stage with a working directory, a command, the
+# files it reads and the files it writes. A stage is skipped when the content hash of its inputs (data and code)
+# matches the last successful run and its outputs still exist. Stages whose dependencies are done run concurrently,
+# each in its own process, and every stage reports its wall time, peak RSS and the rows it processed.
+#
+#   python pipeline.py                 run everything that changed
+#   python pipeline.py --stage census  run one stage (and nothing that depends on it)
+#   python pipeline.py --force         rebuild every stage
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+STATE_DIR = os.path.join(ROOT, ".pipeline")
+MANIFEST_FILE = os.path.join(STATE_DIR, "manifest.json")
+METRICS_FILE = os.path.join(STATE_DIR, "metrics.jsonl")
+LOG_DIR = os.path.join(STATE_DIR, "logs")
+
+# Stage results that stop dependent stages from running
+BLOCKING = {"failed", "missing_input", "blocked"}
+
+
+# -------------------- Row counters --------------------
+def csv_rows(path):
+    # Data rows of a CSV file, counted without parsing it
+    with open(path, "rb") as f:
+        return sum(block.count(b"\n") for block in iter(lambda: f.read(1 << 20), b"")) - 1
+
+
+def column_total(path, column):
+    return int(pd.read_csv(path, usecols=[column])[column].sum())
+
+
+def parquet_rows(path):
+    import pyarrow.parquet as pq
+    return pq.ParquetFile(path).metadata.num_rows
+
+
+# -------------------- Stages --------------------
+# 'inputs' and 'outputs' are glob patterns relative to 'cwd'; 'rows' counts the rows the stage processed, given the
+# stage's directory. The inputs list every module the stage's command imports, so a code change re-runs the stage.
+STAGES = [
+    {
+        "name": "sales",
+        "cwd": "Sales Report",
+        "command": [sys.executable, "-c",
+                    "from Sales_Report import SalesReport; "
+                    "SalesReport('Data/sales_data.csv', 'Data/trimmed_data.csv', report_dir='Reports').run()"],
+        "inputs": ["Data/sales_data.csv", "Sales_Report.py", "../instrumentation.py"],
+        "outputs": ["Data/trimmed_data.csv", "Reports/*.csv"],
+        "rows": lambda cwd: csv_rows(os.path.join(cwd, "Data", "trimmed_data.csv")),
+    },
+    {
+        "name": "census",
+        "cwd": "US Census Data",
+        "command": [sys.executable, "US Census.py", "--refresh"],
+        "inputs": ["Raw Data CSVs/states*.csv", "census.py", "US Census.py"],
+        "outputs": ["Raw Data CSVs/census_cache.parquet"],
+        "rows": lambda cwd: parquet_rows(os.path.join(cwd, "Raw Data CSVs", "census_cache.parquet")),
+    },
+    {
+        "name": "climate_split",
+        "cwd": "Indonesian Climate Data",
+        "command": [sys.executable, "InClim_Clean_Split.py"],
+        "inputs": ["climate_data.csv", "outlier_rules.json", "InClim_Clean_Split.py", "outlier_rules.py",
+                   "quality_report.py", "station_io.py"],
+        "outputs": ["station_index.csv", "station_quality.csv", "outlier_rejections.csv", "station_datasets/*"],
+        "rows": lambda cwd: column_total(os.path.join(cwd, "station_index.csv"), "records"),
+    },
+    {
+        "name": "climate_impute",
+        "cwd": "Indonesian Climate Data",
+        "command": [sys.executable, "InClim_Fill_NaN.py"],
+        "inputs": ["station_index.csv", "station_datasets/**/*", "InClim_Fill_NaN.py", "imputers.py", "station_io.py",
+                   "station_matrix.py"],
+        "outputs": ["station_ds_complete/*.csv"],
+        "after": ["climate_split"],
+        "rows": lambda cwd: column_total(os.path.join(cwd, "station_ds_complete", "imputation_stats.csv"), "rows"),
+    },
+    {
+        "name": "biodiversity",
+        "cwd": "NatPark Biodiversity",
+        "command": [sys.executable, "Portfolio_Workflow.py"],
+        "inputs": ["Data/observations.csv", "Data/species_info.csv", "*.py", "../instrumentation.py"],
+        "outputs": ["Output/*.csv", "Output/*.png", "Output/*.pdf"],
+        "rows": lambda cwd: csv_rows(os.path.join(cwd, "Data", "observations.csv")),
+    },
+]
+
+
+def expand(cwd, patterns):
+    # Files matching each pattern, or None for a pattern that matches nothing
+    matches = []
+    for pattern in patterns:
+        files = sorted(path for path in glob.glob(os.path.join(ROOT, cwd, pattern), recursive=True)
+                       if os.path.isfile(path))
+        if not files:
+            return None
+        matches += files
+    return matches
+
+
+def content_hash(files):
+    digest = hashlib.sha256()
+    for path in files:
+        digest.update(os.path.relpath(path, ROOT).encode() + b"\0")
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def run_command(stage, log_path):
+    # Runs the stage's command and returns its exit code and peak RSS in MB. os.wait4 gives the resource usage of
+    # this child alone, so concurrent stages don't mix up their peaks. The repository root is on the child's path so
+    # the workflows can import instrumentation.py.
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")]))}
+    with open(log_path, "w") as log:
+        process = subprocess.Popen(stage["command"], cwd=os.path.join(ROOT, stage["cwd"]), env=env, stdout=log,
+                                   stderr=subprocess.STDOUT)
+        _, status, usage = os.wait4(process.pid, 0)
+        process.returncode = os.waitstatus_to_exitcode(status)
+    return process.returncode, usage.ru_maxrss / 1024
+
+
+def run_stage(stage, manifest, force=False):
+    """
+    Run one stage unless its inputs are unchanged since its last successful run.
+
+    Returns
+    -------
+    dict
+        Stage metrics: status ('ran', 'skipped', 'failed' or 'missing_input'), wall time in seconds, peak RSS in MB,
+        rows processed and the input hash.
+    """
+    metrics = {"stage": stage["name"], "status": None, "seconds": 0.0, "peak_rss_mb": None, "rows": None,
+               "input_hash": None}
+    inputs = expand(stage["cwd"], stage["inputs"])
+    if inputs is None:
+        metrics["status"] = "missing_input"
+        return metrics
+
+    metrics["input_hash"] = content_hash(inputs)
+    entry = manifest.get(stage["name"], {})
+    if not force and entry.get("input_hash") == metrics["input_hash"] and expand(stage["cwd"], stage["outputs"]):
+        metrics.update(status="skipped", rows=entry.get("rows"))
+        return metrics
+
+    start = time.perf_counter()
+    returncode, metrics["peak_rss_mb"] = run_command(stage, os.path.join(LOG_DIR, f"{stage['name']}.log"))
+    metrics["seconds"] = round(time.perf_counter() - start, 3)
+    metrics["peak_rss_mb"] = round(metrics["peak_rss_mb"], 1)
+    if returncode != 0:
+        metrics["status"] = "failed"
+        return metrics
+
+    metrics["status"] = "ran"
+    try:
+        metrics["rows"] = stage["rows"](os.path.join(ROOT, stage["cwd"]))
+    except (OSError, ValueError, KeyError):
+        # The stage ran, its row count is just not available
+        pass
+    return metrics
+
+
+def run_pipeline(stages=STAGES, workers=None, force=False):
+    """
+    Run the stages in dependency order, independent stages concurrently.
+
+    Parameters
+    ----------
+    stages : list of dict
+        Stages to run. Dependencies ('after') on stages not in the list are treated as done.
+    workers : int, optional
+        Maximum number of stages running at once (default: every ready stage).
+    force : bool
+        Run every stage even if its inputs are unchanged.
+
+    Returns
+    -------
+    list of dict
+        Metrics of every stage, in completion order.
+    """
+    os.makedirs(LOG_DIR, exist_ok=True)
+    manifest = {}
+    if os.path.exists(MANIFEST_FILE):
+        with open(MANIFEST_FILE) as f:
+            manifest = json.load(f)
+
+    names = {stage["name"] for stage in stages}
+    pending = list(stages)
+    results, done, running = [], {}, {}
+    with ThreadPoolExecutor(max_workers=workers or len(stages) or 1) as executor:
+        while pending or running:
+            for stage in list(pending):
+                deps = [dep for dep in stage.get("after", []) if dep in names]
+                if any(done.get(dep) in BLOCKING for dep in deps):
+                    pending.remove(stage)
+                    done[stage["name"]] = "blocked"
+                    results.append({"stage": stage["name"], "status": "blocked"})
+                elif all(dep in done for dep in deps):
+                    pending.remove(stage)
+                    running[executor.submit(run_stage, stage, manifest, force)] = stage
+            if not running:
+                if pending:
+                    raise ValueError(f"Stages {[stage['name'] for stage in pending]} have circular dependencies")
+                continue
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                stage = running.pop(future)
+                try:
+                    metrics = future.result()
+                except Exception as e:
+                    # The runner itself failed (unreadable input, log directory, ...): record it as a failed stage
+                    # so its dependents are blocked and the run record is still written
+                    metrics = {"stage": stage["name"], "status": "failed", "seconds": None, "peak_rss_mb": None,
+                               "rows": None, "input_hash": None, "error": f"{type(e).__name__}: {e}"}
+                done[stage["name"]] = metrics["status"]
+                results.append(metrics)
+                error = f" ({metrics['error']})" if "error" in metrics else ""
+                print(f"{stage['name']}: {metrics['status']}{error}")
+                if metrics["status"] == "ran":
+                    manifest[stage["name"]] = {"input_hash": metrics["input_hash"], "rows": metrics["rows"]}
+                    with open(MANIFEST_FILE, "w") as f:
+                        json.dump(manifest, f, indent=1)
+
+    run_at = time.strftime("%Y-%m-%dT%H:%M:%S")
+    with open(METRICS_FILE, "a") as f:
+        for metrics in results:
+            f.write(json.dumps({"run_at": run_at, **metrics}) + "\n")
+    return results
+
+
+if __name__ == "__main__":
+    stage_names = [stage["name"] for stage in STAGES]
+    parser = argparse.ArgumentParser(description="Run the portfolio workflows, skipping unchanged stages.")
+    parser.add_argument("--stage", nargs="+", choices=stage_names, help="Run only these stages")
+    parser.add_argument("--workers", type=int, default=None, help="Maximum number of stages running at once")
+    parser.add_argument("--force", action="store_true", help="Run stages even if their inputs are unchanged")
+    args = parser.parse_args()
+
+    selected = [stage for stage in STAGES if args.stage is None or stage["name"] in args.stage]
+    results = run_pipeline(selected, workers=args.workers, force=args.force)
+
+    summary = pd.DataFrame(results, columns=["stage", "status", "seconds", "peak_rss_mb", "rows"]).set_index("stage")
+    print(summary.to_string())
+    print(f"Logs in {LOG_DIR}, metrics appended to {METRICS_FILE}")
+    if (summary["status"] == "failed").any():
+        sys.exit(1)